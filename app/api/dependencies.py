@@ -1,14 +1,20 @@
 """API route dependencies."""
 
+from functools import lru_cache
+from pathlib import Path
+
 from fastapi import Depends, HTTPException, status
 
 from app.config import Settings, get_settings
+from app.services.cache import ShortsCacheService, get_shorts_cache
 from app.services.gemini_client import GeminiClient, get_gemini_client
 from app.services.transcription import TranscriptionService, get_transcription_service
 from app.services.shorts_identifier import (
     ShortsIdentifierService,
     get_shorts_identifier_service,
 )
+from app.services.task_queue import TaskQueue, get_task_queue
+from app.services.video_analyzer import VideoAnalyzerService, get_video_analyzer_service
 from app.services.video_clipper import VideoClipperService, get_video_clipper_service
 from app.utils.file_manager import get_upload_path
 
@@ -51,6 +57,17 @@ def get_shorts_identifier() -> ShortsIdentifierService:
         )
 
 
+def get_analyzer() -> VideoAnalyzerService:
+    """Dependency for getting the combined video analyzer service."""
+    try:
+        return get_video_analyzer_service()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Video analyzer not available: {str(e)}",
+        )
+
+
 def get_clipper() -> VideoClipperService:
     """Dependency for getting video clipper service."""
     try:
@@ -62,8 +79,25 @@ def get_clipper() -> VideoClipperService:
         )
 
 
-def validate_video_id(video_id: str):
-    """Validate that a video exists."""
+def get_cache() -> ShortsCacheService:
+    """Dependency for getting the shorts cache."""
+    try:
+        return get_shorts_cache()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Shorts cache not available: {str(e)}",
+        )
+
+
+def get_tasks() -> TaskQueue:
+    """Dependency for getting the background task queue."""
+    return get_task_queue()
+
+
+@lru_cache(maxsize=1024)
+def _resolve_upload(video_id: str) -> Path:
+    """Resolve a video ID to its upload path (misses raise and aren't cached)."""
     video_path = get_upload_path(video_id)
     if not video_path:
         raise HTTPException(
@@ -71,3 +105,14 @@ def validate_video_id(video_id: str):
             detail=f"Video not found: {video_id}",
         )
     return video_path
+
+
+def validate_video_id(video_id: str) -> Path:
+    """Dependency that validates a video exists and returns its path."""
+    video_path = _resolve_upload(video_id)
+    if not video_path.is_file():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Video not found: {video_id}",
+        )
+    return video_path
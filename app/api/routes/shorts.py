@@ -1,120 +1,317 @@
 """Shorts identification and generation API routes."""
 
+import asyncio
+from pathlib import Path
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import FileResponse
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 from app.api.dependencies import (
+    get_analyzer,
+    get_cache,
     get_shorts_identifier,
     get_clipper,
+    get_tasks,
     validate_video_id,
 )
 from app.schemas.shorts import (
+    PotentialShort,
     ShortsIdentificationResponse,
     GenerateShortsResponse,
+    TaskSubmittedResponse,
+    TaskStatusResponse,
+    VideoAnalysisResponse,
 )
-from app.services.shorts_identifier import ShortsIdentifierService
+from app.services.cache import ShortsCacheService
+from app.services.shorts_identifier import (
+    MAX_SHORTS_PER_RESPONSE,
+    ShortsIdentifierService,
+)
+from app.services.task_queue import TaskQueue
+from app.services.video_analyzer import VideoAnalyzerService
 from app.services.video_clipper import VideoClipperService
 from app.utils.file_manager import get_output_path
+from app.utils.ranged_file import iter_file, parse_range_header
 
 router = APIRouter(prefix="/shorts", tags=["Shorts"])
 
 
-# In-memory storage for identified shorts (in production, use a database)
-_shorts_cache: dict[str, list] = {}
+# In-flight identification runs, keyed by (video_id, max_shorts)
+_identify_inflight: dict[tuple[str, int], asyncio.Task] = {}
+
+
+async def _identify_job(
+    video_id: str,
+    video_path: Path,
+    max_shorts: int,
+    shorts_service: ShortsIdentifierService,
+    cache: ShortsCacheService,
+) -> ShortsIdentificationResponse:
+    """Identify shorts for a video and cache them for later generation."""
+    analysis = await shorts_service.identify_shorts_from_video(
+        video_path=video_path,
+        max_shorts=max_shorts,
+    )
+
+    # Cache the shorts for later generation
+    await cache.put(video_id, analysis.shorts)
+
+    return ShortsIdentificationResponse(
+        video_id=video_id,
+        analysis=analysis,
+        status="completed",
+    )
+
+
+async def _identify_once(
+    video_id: str,
+    video_path: Path,
+    max_shorts: int,
+    shorts_service: ShortsIdentifierService,
+    cache: ShortsCacheService,
+) -> ShortsIdentificationResponse:
+    """
+    Run identification, sharing one pipeline run between concurrent callers.
+
+    A caller arriving while the same video is already being identified with
+    the same parameters awaits that run instead of starting another one.
+    """
+    key = (video_id, max_shorts)
+    task = _identify_inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(
+            _identify_job(video_id, video_path, max_shorts, shorts_service, cache)
+        )
+        _identify_inflight[key] = task
+        task.add_done_callback(lambda _: _identify_inflight.pop(key, None))
+
+    # Shield so one caller disconnecting doesn't cancel the shared run
+    return await asyncio.shield(task)
+
+
+async def _generate_job(
+    video_id: str,
+    video_path: Path,
+    shorts: list[PotentialShort],
+    short_indices: list[int] | None,
+    clipper_service: VideoClipperService,
+) -> GenerateShortsResponse:
+    """Clip the requested shorts from a video."""
+    generated = await run_in_threadpool(
+        clipper_service.generate_shorts,
+        video_path=video_path,
+        shorts=shorts,
+        video_id=video_id,
+        indices=short_indices,
+    )
+
+    return GenerateShortsResponse(
+        video_id=video_id,
+        shorts=generated,
+        status="completed",
+    )
+
+
+async def _get_shorts_to_generate(
+    video_id: str,
+    cache: ShortsCacheService,
+) -> list[PotentialShort]:
+    """Get cached shorts for a video, raising if there are none."""
+    shorts = await cache.get(video_id)
+    if shorts is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No shorts identified for this video. Call /identify first.",
+        )
+
+    if not shorts:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No shorts available to generate.",
+        )
+
+    return shorts
 
 
 @router.post(
     "/identify/{video_id}",
     response_model=ShortsIdentificationResponse,
+    response_model_exclude_unset=True,
+    response_model_exclude_none=True,
     summary="Identify potential shorts",
     description="Analyze a video to identify the best segments for YouTube Shorts.",
 )
 async def identify_shorts(
     video_id: str,
-    max_shorts: int = 5,
+    video_path: Path = Depends(validate_video_id),
+    max_shorts: Annotated[int, Query(ge=1, le=MAX_SHORTS_PER_RESPONSE)] = 5,
     shorts_service: ShortsIdentifierService = Depends(get_shorts_identifier),
+    cache: ShortsCacheService = Depends(get_cache),
 ) -> ShortsIdentificationResponse:
     """Identify potential shorts from an uploaded video."""
-    video_path = validate_video_id(video_id)
 
     try:
-        analysis = shorts_service.identify_shorts_from_video(
-            video_path=video_path,
-            max_shorts=max_shorts,
+        return await _identify_once(
+            video_id, video_path, max_shorts, shorts_service, cache
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Shorts identification failed: {str(e)}",
         )
 
-        # Cache the shorts for later generation
-        _shorts_cache[video_id] = analysis.shorts
 
-        return ShortsIdentificationResponse(
-            video_id=video_id,
-            analysis=analysis,
-            status="completed",
-        )
+@router.post(
+    "/analyze/{video_id}",
+    response_model=VideoAnalysisResponse,
+    response_model_exclude_unset=True,
+    response_model_exclude_none=True,
+    summary="Transcribe and identify shorts",
+    description="Transcribe a video and identify shorts concurrently from a single audio upload.",
+)
+async def analyze_video(
+    video_id: str,
+    video_path: Path = Depends(validate_video_id),
+    max_shorts: Annotated[int, Query(ge=1, le=MAX_SHORTS_PER_RESPONSE)] = 5,
+    analyzer: VideoAnalyzerService = Depends(get_analyzer),
+    cache: ShortsCacheService = Depends(get_cache),
+) -> VideoAnalysisResponse:
+    """Transcribe an uploaded video and identify potential shorts."""
+
+    try:
+        transcription, analysis = await analyzer.analyze_video(video_path, max_shorts)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Shorts identification failed: {str(e)}",
+            detail=f"Video analysis failed: {str(e)}",
         )
 
+    # Cache the shorts for later generation
+    await cache.put(video_id, analysis.shorts)
+
+    return VideoAnalysisResponse(
+        video_id=video_id,
+        transcription=transcription,
+        analysis=analysis,
+        status="completed",
+    )
+
 
 @router.post(
     "/generate/{video_id}",
     response_model=GenerateShortsResponse,
+    response_model_exclude_unset=True,
+    response_model_exclude_none=True,
     summary="Generate short clips",
     description="Generate video clips for identified shorts.",
 )
 async def generate_shorts(
     video_id: str,
+    video_path: Path = Depends(validate_video_id),
     short_indices: list[int] | None = None,
     clipper_service: VideoClipperService = Depends(get_clipper),
+    cache: ShortsCacheService = Depends(get_cache),
 ) -> GenerateShortsResponse:
     """Generate short video clips from identified segments."""
-    video_path = validate_video_id(video_id)
+    shorts = await _get_shorts_to_generate(video_id, cache)
 
-    # Get cached shorts
-    if video_id not in _shorts_cache:
+    try:
+        return await _generate_job(
+            video_id, video_path, shorts, short_indices, clipper_service
+        )
+    except Exception as e:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="No shorts identified for this video. Call /identify first.",
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Shorts generation failed: {str(e)}",
         )
 
-    shorts = _shorts_cache[video_id]
 
-    if not shorts:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="No shorts available to generate.",
-        )
+@router.post(
+    "/tasks/identify/{video_id}",
+    response_model=TaskSubmittedResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Queue shorts identification",
+    description="Queue shorts identification in the background and return a task ID to poll.",
+)
+async def queue_identify_shorts(
+    video_id: str,
+    video_path: Path = Depends(validate_video_id),
+    max_shorts: Annotated[int, Query(ge=1, le=MAX_SHORTS_PER_RESPONSE)] = 5,
+    shorts_service: ShortsIdentifierService = Depends(get_shorts_identifier),
+    cache: ShortsCacheService = Depends(get_cache),
+    tasks: TaskQueue = Depends(get_tasks),
+) -> TaskSubmittedResponse:
+    """Queue shorts identification for an uploaded video."""
 
-    try:
-        generated = clipper_service.generate_shorts(
-            video_path=video_path,
-            shorts=shorts,
-            video_id=video_id,
-            indices=short_indices,
-        )
+    task_id = await tasks.submit(
+        _identify_once, video_id, video_path, max_shorts, shorts_service, cache
+    )
+    return TaskSubmittedResponse(
+        task_id=task_id,
+        status_url=f"/api/v1/shorts/tasks/{task_id}",
+    )
 
-        return GenerateShortsResponse(
-            video_id=video_id,
-            shorts=generated,
-            status="completed",
-        )
-    except Exception as e:
+
+@router.post(
+    "/tasks/generate/{video_id}",
+    response_model=TaskSubmittedResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Queue short clip generation",
+    description="Queue clip generation in the background and return a task ID to poll.",
+)
+async def queue_generate_shorts(
+    video_id: str,
+    video_path: Path = Depends(validate_video_id),
+    short_indices: list[int] | None = None,
+    clipper_service: VideoClipperService = Depends(get_clipper),
+    cache: ShortsCacheService = Depends(get_cache),
+    tasks: TaskQueue = Depends(get_tasks),
+) -> TaskSubmittedResponse:
+    """Queue clip generation for identified segments."""
+    shorts = await _get_shorts_to_generate(video_id, cache)
+
+    task_id = await tasks.submit(
+        _generate_job, video_id, video_path, shorts, short_indices, clipper_service
+    )
+    return TaskSubmittedResponse(
+        task_id=task_id,
+        status_url=f"/api/v1/shorts/tasks/{task_id}",
+    )
+
+
+@router.get(
+    "/tasks/{task_id}",
+    response_model=TaskStatusResponse,
+    response_model_exclude_none=True,
+    summary="Get background task status",
+    description="Poll the status and result of a queued identification or generation task.",
+)
+async def get_task_status(
+    task_id: str,
+    tasks: TaskQueue = Depends(get_tasks),
+) -> TaskStatusResponse:
+    """Get the status of a background task."""
+    task = await tasks.get(task_id)
+    if task is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Shorts generation failed: {str(e)}",
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task not found: {task_id}",
         )
+    return task
 
 
 @router.get(
     "/{short_id}",
     summary="Download a generated short",
-    description="Download a generated short video file.",
+    description="Download a generated short video file. Supports HTTP Range requests for seeking.",
 )
-async def download_short(short_id: str) -> FileResponse:
+async def download_short(
+    short_id: str,
+    range_header: Annotated[str | None, Header(alias="range")] = None,
+) -> StreamingResponse:
     """Download a generated short video."""
     short_path = get_output_path(short_id)
 
@@ -124,28 +321,71 @@ async def download_short(short_id: str) -> FileResponse:
             detail=f"Short not found: {short_id}",
         )
 
-    return FileResponse(
-        path=short_path,
+    file_size = short_path.stat().st_size
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'attachment; filename="{short_id}.mp4"',
+    }
+
+    try:
+        byte_range = parse_range_header(range_header, file_size)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail=str(e),
+            headers={"Content-Range": f"bytes */{file_size}"},
+        )
+
+    if byte_range is None:
+        start, end = 0, file_size - 1
+        status_code = status.HTTP_200_OK
+    else:
+        start, end = byte_range
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+
+    headers["Content-Length"] = str(end - start + 1)
+
+    return StreamingResponse(
+        iter_file(short_path, start, end),
+        status_code=status_code,
         media_type="video/mp4",
-        filename=f"{short_id}.mp4",
+        headers=headers,
     )
 
 
 @router.get(
     "/cache/{video_id}",
     summary="Get cached shorts for a video",
-    description="Retrieve previously identified shorts for a video.",
+    description="Retrieve previously identified shorts for a video. Supports ETag revalidation.",
 )
-async def get_cached_shorts(video_id: str):
+async def get_cached_shorts(
+    video_id: str,
+    if_none_match: Annotated[str | None, Header()] = None,
+    cache: ShortsCacheService = Depends(get_cache),
+) -> Response:
     """Get cached shorts identification results."""
-    if video_id not in _shorts_cache:
+    cached = await cache.get_serialized(video_id)
+    if cached is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No cached shorts for this video.",
         )
 
-    return {
-        "video_id": video_id,
-        "shorts_count": len(_shorts_cache[video_id]),
-        "shorts": [s.model_dump() for s in _shorts_cache[video_id]],
-    }
+    etag = f'"{cached.etag}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=60"}
+
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # Splice the pre-serialized shorts into the envelope (no re-serialization)
+    content = b"".join([
+        b'{"video_id":',
+        orjson.dumps(video_id),
+        b',"shorts_count":',
+        str(cached.count).encode(),
+        b',"shorts":',
+        cached.content,
+        b"}",
+    ])
+    return Response(content=content, media_type="application/json", headers=headers)
@@ -1,9 +1,11 @@
 """Video upload and transcription API routes."""
 
+import asyncio
 from pathlib import Path
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
 
 from app.api.dependencies import (
     get_transcriber,
@@ -14,19 +16,42 @@ from app.schemas.transcription import TranscriptionResponse
 from app.services.transcription import TranscriptionService
 from app.services.video_clipper import get_video_clipper_service
 from app.utils.file_manager import save_upload_file, get_file_size
+from app.utils.time_utils import format_timestamp
 
 router = APIRouter(prefix="/videos", tags=["Videos"])
 
 
 # Allowed video MIME types
-ALLOWED_MIME_TYPES = {
+ALLOWED_MIME_TYPES: frozenset[str] = frozenset({
     "video/mp4",
     "video/quicktime",
     "video/x-msvideo",
     "video/x-matroska",
     "video/webm",
     "video/mpeg",
-}
+})
+
+# Allowed video file extensions (fallback when the MIME type is unknown)
+ALLOWED_EXTS: frozenset[str] = frozenset({
+    ".mp4", ".mov", ".avi", ".mkv", ".webm", ".mpeg",
+})
+
+# Formatted once for error messages
+_ALLOWED_MIME_TYPES_TEXT = ", ".join(sorted(ALLOWED_MIME_TYPES))
+
+
+async def _probe_duration(file_path: Path) -> str | None:
+    """Get a video's duration as MM:SS, or None if it can't be determined."""
+    try:
+        clipper = get_video_clipper_service()
+        duration_seconds = await clipper.get_video_duration_async(file_path)
+    except Exception:
+        return None
+
+    if duration_seconds <= 0:
+        return None
+
+    return format_timestamp(duration_seconds)
 
 
 @router.post(
@@ -40,35 +65,23 @@ async def upload_video(
     file: Annotated[UploadFile, File(description="Video file to upload")],
 ) -> VideoUploadResponse:
     """Upload a video file for processing."""
-    # Validate file type
+    # Validate file type (by MIME type, or by extension as fallback)
     content_type = file.content_type or ""
-    if content_type not in ALLOWED_MIME_TYPES:
-        # Check by extension as fallback
-        if file.filename:
-            ext = Path(file.filename).suffix.lower()
-            if ext not in {".mp4", ".mov", ".avi", ".mkv", ".webm", ".mpeg"}:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Unsupported file type: {content_type}. Allowed: {ALLOWED_MIME_TYPES}",
-                )
+    ext = Path(file.filename or "").suffix.lower()
+    if content_type not in ALLOWED_MIME_TYPES and ext not in ALLOWED_EXTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported file type: {content_type}. Allowed: {_ALLOWED_MIME_TYPES_TEXT}",
+        )
 
     # Save the uploaded file
     video_id, file_path = await save_upload_file(file)
 
-    # Get file size
-    file_size = get_file_size(file_path)
-
-    # Try to get video duration
-    duration = None
-    try:
-        clipper = get_video_clipper_service()
-        duration_seconds = clipper.get_video_duration(file_path)
-        if duration_seconds > 0:
-            minutes = int(duration_seconds // 60)
-            seconds = int(duration_seconds % 60)
-            duration = f"{minutes:02d}:{seconds:02d}"
-    except Exception:
-        pass
+    # Get file size and video duration concurrently
+    file_size, duration = await asyncio.gather(
+        asyncio.to_thread(get_file_size, file_path),
+        _probe_duration(file_path),
+    )
 
     return VideoUploadResponse(
         video_id=video_id,
@@ -86,13 +99,15 @@ async def upload_video(
 )
 async def transcribe_video(
     video_id: str,
+    video_path: Annotated[Path, Depends(validate_video_id)],
     transcription_service: Annotated[TranscriptionService, Depends(get_transcriber)],
 ) -> TranscriptionResponse:
     """Transcribe an uploaded video."""
-    video_path = validate_video_id(video_id)
 
     try:
-        transcription = transcription_service.transcribe_video(video_path)
+        transcription = await run_in_threadpool(
+            transcription_service.transcribe_video, video_path
+        )
 
         return TranscriptionResponse(
             video_id=video_id,
@@ -28,6 +28,36 @@ class Settings(BaseSettings):
     min_short_duration: int = 15  # seconds
     max_short_duration: int = 60  # seconds
     max_shorts_to_generate: int = 5
+    context_optimization_pass: bool = False  # Snap starts to audio pauses after identification
+
+    # CORS Configuration (JSON list in the environment)
+    cors_origins: list[str] = [
+        "http://localhost:5173",
+        "http://localhost:8000",
+        "http://127.0.0.1:8000",
+        "http://localhost:5000",
+        "http://127.0.0.1:5000",
+    ]
+
+    # Concurrency Configuration
+    threadpool_size: int | None = None  # Blocking-call threads (None = CPU count)
+    clip_workers: int | None = None  # Concurrent FFmpeg clip jobs (None = CPU count)
+    hw_encoder: str | None = None  # h264_nvenc/h264_videotoolbox/h264_qsv or "auto" (None = libx264)
+    task_workers: int = 2  # Background jobs run at once per worker process (queued tasks)
+    smart_cut: bool = False  # Exact cuts: re-encode only up to the first keyframe (H.264 sources)
+
+    # Frontend Configuration
+    static_cache_max_age: int = 3600  # seconds browsers may reuse static assets
+
+    # Cache Configuration
+    redis_url: str | None = None  # Use Redis when set, otherwise in-memory
+    shorts_cache_ttl: int = 3600  # seconds
+    shorts_cache_maxsize: int = 1024  # entries (in-memory backend only)
+    response_cache_enabled: bool = True  # Reuse AI results for identical videos
+    response_cache_dir: Path = Path("~/.cache/shorts_generation")
+    similar_audio_cache: bool = False  # Also reuse results for re-encoded copies
+    reuse_uploads: bool = False  # Reuse Gemini uploads of identical files (kept ~48h)
+    prompt_cache_ttl: int = 0  # Explicit context cache TTL for static prompts (0 = off)
 
     def ensure_directories(self) -> None:
         """Create necessary directories if they don't exist."""
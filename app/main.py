@@ -1,16 +1,18 @@
 """FastAPI application entry point."""
 
+import os
 from contextlib import asynccontextmanager
 from pathlib import Path
 
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 
 from app.config import get_settings
 from app.api.routes import videos, shorts
 from app.utils.logging import setup_logging, get_logger
+from app.utils.static_files import CachedStaticFiles
 
 # Initialize logging
 setup_logging()
@@ -26,18 +28,27 @@ async def lifespan(app: FastAPI):
     # Startup
     settings = get_settings()
     settings.ensure_directories()
-    
-    logger.info("=" * 60)
-    logger.info("🚀 YouTube Shorts Generator API Starting...")
-    logger.info("=" * 60)
-    logger.info(f"📁 Upload directory: {settings.upload_dir.absolute()}")
-    logger.info(f"📁 Output directory: {settings.output_dir.absolute()}")
-    logger.info(f"🤖 Gemini model: {settings.gemini_model}")
-    logger.info(f"🎬 Video FPS: {settings.video_fps}")
-    logger.info(f"⏱️ Short duration: {settings.min_short_duration}-{settings.max_short_duration}s")
-    logger.info("=" * 60)
-    logger.info("✅ API is ready!")
-    logger.info("=" * 60)
+
+    # Size the threadpool used for blocking FFmpeg/Gemini work
+    threadpool_size = settings.threadpool_size or os.cpu_count() or 1
+    to_thread.current_default_thread_limiter().total_tokens = threadpool_size
+
+    separator = "=" * 60
+    banner = "\n".join([
+        separator,
+        "🚀 YouTube Shorts Generator API Starting...",
+        separator,
+        f"📁 Upload directory: {settings.upload_dir.absolute()}",
+        f"📁 Output directory: {settings.output_dir.absolute()}",
+        f"🤖 Gemini model: {settings.gemini_model}",
+        f"🎬 Video FPS: {settings.video_fps}",
+        f"⏱️ Short duration: {settings.min_short_duration}-{settings.max_short_duration}s",
+        f"🧵 Threadpool size: {threadpool_size}",
+        separator,
+        "✅ API is ready!",
+        separator,
+    ])
+    logger.info("\n%s", banner)
 
     yield
 
@@ -74,6 +85,7 @@ Generate YouTube Shorts from longer videos using AI-powered analysis.
     """,
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
 )
@@ -81,10 +93,12 @@ Generate YouTube Shorts from longer videos using AI-powered analysis.
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
+    allow_origins=get_settings().cors_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type", "If-None-Match", "Range"],
+    expose_headers=["ETag", "Content-Range", "Accept-Ranges"],
+    max_age=86400,  # Cache preflight responses for a day
 )
 
 # Include routers
@@ -93,7 +107,14 @@ app.include_router(shorts.router, prefix="/api/v1")
 
 # Serve frontend static files
 if FRONTEND_DIR.exists():
-    app.mount("/static", StaticFiles(directory=FRONTEND_DIR), name="static")
+    app.mount(
+        "/static",
+        CachedStaticFiles(
+            directory=FRONTEND_DIR,
+            max_age=get_settings().static_cache_max_age,
+        ),
+        name="static",
+    )
 
 
 @app.get("/", tags=["Frontend"])
@@ -1,6 +1,8 @@
 """Pydantic schemas for shorts identification."""
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
+
+from app.schemas.transcription import Transcription
 
 
 class PotentialShort(BaseModel):
@@ -20,6 +22,10 @@ class PotentialShort(BaseModel):
     )
 
 
+# Batch (de)serializer for shorts lists, compiled once at import
+SHORTS_LIST_ADAPTER = TypeAdapter(list[PotentialShort])
+
+
 class ShortsAnalysis(BaseModel):
     """Analysis result containing all potential shorts."""
 
@@ -45,6 +51,15 @@ class ShortsIdentificationResponse(BaseModel):
     status: str = "completed"
 
 
+class VideoAnalysisResponse(BaseModel):
+    """Response model for combined transcription and shorts identification."""
+
+    video_id: str
+    transcription: Transcription
+    analysis: ShortsAnalysis
+    status: str = "completed"
+
+
 class GenerateShortsRequest(BaseModel):
     """Request model for generating shorts."""
 
@@ -71,3 +86,25 @@ class GenerateShortsResponse(BaseModel):
     video_id: str
     shorts: list[GeneratedShort]
     status: str = "completed"
+
+
+class TaskSubmittedResponse(BaseModel):
+    """Response model for a queued background task."""
+
+    task_id: str = Field(description="Unique ID of the queued task")
+    status_url: str = Field(description="URL to poll for the task status")
+    status: str = "pending"
+
+
+class TaskStatusResponse(BaseModel):
+    """Status of a background task."""
+
+    task_id: str
+    status: str = Field(
+        default="pending",
+        description="Task state: pending, running, completed, or failed",
+    )
+    result: ShortsIdentificationResponse | GenerateShortsResponse | None = Field(
+        default=None, description="Task result once completed"
+    )
+    error: str | None = Field(default=None, description="Error message if failed")
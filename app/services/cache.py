@@ -0,0 +1,255 @@
+"""Cache backends for identified shorts."""
+
+import asyncio
+import hashlib
+import threading
+from typing import NamedTuple, Protocol, TypeVar
+
+from cachetools import TTLCache
+from redis import asyncio as aioredis
+
+from app.config import get_settings
+from app.schemas.shorts import PotentialShort, SHORTS_LIST_ADAPTER
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class SerializedShorts(NamedTuple):
+    """Pre-serialized shorts list with its ETag, ready to send as-is."""
+
+    content: bytes
+    etag: str
+    count: int
+
+
+def serialize_shorts(shorts: list[PotentialShort]) -> SerializedShorts:
+    """Serialize shorts to JSON once and derive a content ETag."""
+    content = SHORTS_LIST_ADAPTER.dump_json(shorts)
+    etag = hashlib.blake2b(content, digest_size=16).hexdigest()
+    return SerializedShorts(content=content, etag=etag, count=len(shorts))
+
+
+class Cache(Protocol):
+    """Async key-value store for identified shorts."""
+
+    async def get(self, key: str) -> list[PotentialShort] | None:
+        """Return the cached shorts for a key, or None on a miss."""
+        ...
+
+    async def get_serialized(self, key: str) -> SerializedShorts | None:
+        """Return the pre-serialized shorts for a key, or None on a miss."""
+        ...
+
+    async def set(
+        self,
+        key: str,
+        value: list[PotentialShort],
+        ttl: int | None = None,
+    ) -> None:
+        """Store shorts under a key, optionally expiring after ttl seconds."""
+        ...
+
+    async def get_bytes(self, key: str) -> bytes | None:
+        """Return the raw value stored under a key, or None on a miss."""
+        ...
+
+    async def set_bytes(self, key: str, value: bytes, ttl: int | None = None) -> None:
+        """Store a raw value under a key, optionally expiring after ttl seconds."""
+        ...
+
+
+class InMemoryBackend:
+    """Process-local LRU cache with a fixed TTL (for development)."""
+
+    def __init__(self, maxsize: int = 1024, ttl: int = 3600):
+        """
+        Initialize the in-memory backend.
+
+        Args:
+            maxsize: Maximum number of entries kept before LRU eviction
+            ttl: Time-to-live in seconds applied to every entry
+        """
+        self._data: TTLCache[
+            str, tuple[list[PotentialShort], SerializedShorts]
+        ] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._blobs: TTLCache[str, bytes] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = asyncio.Lock()
+
+    async def get(self, key: str) -> list[PotentialShort] | None:
+        """Return the cached shorts for a key, or None on a miss."""
+        async with self._lock:
+            entry = self._data.get(key)
+        return entry[0] if entry else None
+
+    async def get_serialized(self, key: str) -> SerializedShorts | None:
+        """Return the pre-serialized shorts for a key, or None on a miss."""
+        async with self._lock:
+            entry = self._data.get(key)
+        return entry[1] if entry else None
+
+    async def set(
+        self,
+        key: str,
+        value: list[PotentialShort],
+        ttl: int | None = None,
+    ) -> None:
+        """
+        Store shorts under a key.
+
+        The per-call ttl is ignored; entries expire after the backend TTL.
+        """
+        serialized = serialize_shorts(value)
+        async with self._lock:
+            self._data[key] = (value, serialized)
+
+    async def get_bytes(self, key: str) -> bytes | None:
+        """Return the raw value stored under a key, or None on a miss."""
+        async with self._lock:
+            return self._blobs.get(key)
+
+    async def set_bytes(self, key: str, value: bytes, ttl: int | None = None) -> None:
+        """
+        Store a raw value under a key.
+
+        The per-call ttl is ignored; entries expire after the backend TTL.
+        """
+        async with self._lock:
+            self._blobs[key] = value
+
+
+class RedisBackend:
+    """
+    Redis-backed cache shared across workers and restarts.
+
+    Each entry is a hash holding the serialized shorts, their ETag and count.
+    """
+
+    def __init__(self, url: str):
+        """
+        Initialize the Redis backend.
+
+        Args:
+            url: Redis connection URL (e.g., redis://localhost:6379/0)
+        """
+        self._redis = aioredis.from_url(url)
+
+    async def get(self, key: str) -> list[PotentialShort] | None:
+        """Return the cached shorts for a key, or None on a miss."""
+        raw = await self._redis.hget(key, "shorts")
+        if raw is None:
+            return None
+        return SHORTS_LIST_ADAPTER.validate_json(raw)
+
+    async def get_serialized(self, key: str) -> SerializedShorts | None:
+        """Return the pre-serialized shorts for a key, or None on a miss."""
+        content, etag, count = await self._redis.hmget(key, "shorts", "etag", "count")
+        if content is None:
+            return None
+        return SerializedShorts(content=content, etag=etag.decode(), count=int(count))
+
+    async def set(
+        self,
+        key: str,
+        value: list[PotentialShort],
+        ttl: int | None = None,
+    ) -> None:
+        """Store shorts under a key, optionally expiring after ttl seconds."""
+        serialized = serialize_shorts(value)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(
+                key,
+                mapping={
+                    "shorts": serialized.content,
+                    "etag": serialized.etag,
+                    "count": serialized.count,
+                },
+            )
+            if ttl:
+                pipe.expire(key, ttl)
+            await pipe.execute()
+
+    async def get_bytes(self, key: str) -> bytes | None:
+        """Return the raw value stored under a key, or None on a miss."""
+        return await self._redis.get(key)
+
+    async def set_bytes(self, key: str, value: bytes, ttl: int | None = None) -> None:
+        """Store a raw value under a key, optionally expiring after ttl seconds."""
+        await self._redis.set(key, value, ex=ttl or None)
+
+
+class ShortsCacheService:
+    """Stores identified shorts per video on top of a cache backend."""
+
+    def __init__(self, backend: Cache, ttl: int):
+        """
+        Initialize the shorts cache service.
+
+        Args:
+            backend: Cache backend holding the entries
+            ttl: Time-to-live in seconds for stored shorts
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(video_id: str) -> str:
+        """Build the cache key for a video's identified shorts."""
+        return f"shorts:{video_id}"
+
+    async def get(self, video_id: str) -> list[PotentialShort] | None:
+        """Get the identified shorts for a video, or None if not cached."""
+        return self._record(await self.backend.get(self._key(video_id)))
+
+    async def get_serialized(self, video_id: str) -> SerializedShorts | None:
+        """Get the pre-serialized shorts for a video, or None if not cached."""
+        return self._record(await self.backend.get_serialized(self._key(video_id)))
+
+    async def put(self, video_id: str, shorts: list[PotentialShort]) -> None:
+        """Store the identified shorts for a video."""
+        await self.backend.set(self._key(video_id), shorts, ttl=self.ttl)
+
+    def _record(self, entry: T | None) -> T | None:
+        """Count a lookup as a hit or miss and pass the entry through."""
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+
+def _create_backend() -> Cache:
+    """Create the configured cache backend (Redis if set, else in-memory)."""
+    settings = get_settings()
+    if settings.redis_url:
+        logger.info("Using Redis shorts cache")
+        return RedisBackend(settings.redis_url)
+
+    logger.info("Using in-memory shorts cache")
+    return InMemoryBackend(
+        maxsize=settings.shorts_cache_maxsize,
+        ttl=settings.shorts_cache_ttl,
+    )
+
+
+# Singleton instance
+_shorts_cache: ShortsCacheService | None = None
+_shorts_cache_lock = threading.Lock()
+
+
+def get_shorts_cache() -> ShortsCacheService:
+    """Get or create the shorts cache service instance."""
+    global _shorts_cache
+    if _shorts_cache is None:
+        with _shorts_cache_lock:
+            if _shorts_cache is None:
+                _shorts_cache = ShortsCacheService(
+                    backend=_create_backend(),
+                    ttl=get_settings().shorts_cache_ttl,
+                )
+    return _shorts_cache
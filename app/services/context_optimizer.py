@@ -1,12 +1,13 @@
 """Context optimization using Gemini to find optimal start points."""
 
-import json
 from pathlib import Path
 
+import orjson
 from google.genai import types
 
 from app.services.gemini_client import get_gemini_client
 from app.utils.logging import get_logger
+from app.utils.time_utils import calculate_duration
 
 logger = get_logger(__name__)
 
@@ -42,21 +43,12 @@ CONTEXT_SCHEMA = types.Schema(
 )
 
 
-def get_context_optimization_prompt(segments: list[dict]) -> str:
-    """Generate prompt for context optimization."""
-    segments_text = "\n".join([
-        f"- Segment {i+1}: starts at {seg['start_time']}, ends at {seg['end_time']}"
-        for i, seg in enumerate(segments)
-    ])
-    
-    return f"""
-Analyze this audio and optimize the start times for the following video segments.
-
-## Segments to Optimize:
-{segments_text}
+# Static instructions, kept first so the prompt prefix is byte-stable
+CONTEXT_OPTIMIZATION_INSTRUCTIONS = """
+Analyze this audio and optimize the start times for the video segments listed under Segments to Optimize.
 
 ## Your Task:
-For EACH segment above:
+For EACH segment:
 1. Listen to the audio starting from about 10 seconds BEFORE the given start time
 2. Find the nearest COMPLETE SENTENCE BREAK before the start time
 3. The goal is to ensure the clip doesn't start mid-sentence or mid-thought
@@ -76,7 +68,25 @@ Return the optimized start times for each segment.
 """
 
 
-def optimize_segment_starts(
+def get_context_optimization_prompt(segments: list[dict]) -> str:
+    """Generate prompt for context optimization (static instructions, then segments)."""
+    segments_text = "\n".join(
+        f"- Segment {i+1}: starts at {seg['start_time']}, ends at {seg['end_time']}"
+        for i, seg in enumerate(segments)
+    )
+    return f"{CONTEXT_OPTIMIZATION_INSTRUCTIONS}\n## Segments to Optimize:\n{segments_text}\n"
+
+
+def _with_start(segment: dict, start_time: str) -> dict:
+    """Copy a segment with a new start time and recalculated duration."""
+    return {
+        **segment,
+        "start_time": start_time,
+        "duration_seconds": calculate_duration(start_time, segment["end_time"]),
+    }
+
+
+async def optimize_segment_starts(
     segments: list[dict],
     uploaded_file: types.File,
 ) -> list[dict]:
@@ -88,7 +98,8 @@ def optimize_segment_starts(
         uploaded_file: Already uploaded Gemini file (to avoid re-uploading)
         
     Returns:
-        List of segments with optimized start times
+        New list of segments with optimized start times (the input
+        segments are left unchanged)
     """
     if not segments:
         return segments
@@ -100,14 +111,15 @@ def optimize_segment_starts(
     try:
         prompt = get_context_optimization_prompt(segments)
         
-        response = client.generate_content(
+        response = await client.generate_content_async(
             prompt=prompt,
             file=uploaded_file,
             response_schema=CONTEXT_SCHEMA,
             use_video_metadata=False,
+            static_prefix=CONTEXT_OPTIMIZATION_INSTRUCTIONS,
         )
         
-        data = json.loads(response)
+        data = orjson.loads(response)
         optimized = data.get("optimized_segments", [])
         
         # Create lookup for original -> optimized
@@ -115,26 +127,22 @@ def optimize_segment_starts(
             opt["original_start"]: opt 
             for opt in optimized
         }
-        
-        # Apply optimizations
+
+        # Apply optimizations to copies (the input segments are not mutated)
+        optimized_segments = []
         for segment in segments:
-            original_start = segment["start_time"]
-            if original_start in optimization_map:
-                opt = optimization_map[original_start]
-                new_start = opt["optimized_start"]
-                context = opt.get("context_added", "")
-                
-                logger.info(f"   {original_start} → {new_start} ({context})")
-                segment["start_time"] = new_start
-                
-                # Recalculate duration
-                from app.utils.time_utils import calculate_duration
-                segment["duration_seconds"] = calculate_duration(
-                    new_start, segment["end_time"]
-                )
+            opt = optimization_map.get(segment["start_time"])
+            if opt is None:
+                optimized_segments.append(segment)
+                continue
+
+            new_start = opt["optimized_start"]
+            context = opt.get("context_added", "")
+            logger.info(f"   {segment['start_time']} → {new_start} ({context})")
+            optimized_segments.append(_with_start(segment, new_start))
         
         logger.info(f"✅ Context optimization complete")
-        return segments
+        return optimized_segments
         
     except Exception as e:
         logger.warning(f"Context optimization failed: {e}, using original timestamps")
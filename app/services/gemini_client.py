@@ -1,17 +1,63 @@
 """Gemini API client wrapper for video processing."""
 
+import asyncio
+import hashlib
+import os
+import random
+import threading
 import time
+import uuid
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
+import orjson
 from google import genai
 from google.genai import types
 
 from app.config import get_settings
+from app.utils.file_manager import hash_file
 from app.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Don't reuse an uploaded file that expires sooner than this
+UPLOAD_REUSE_MARGIN = timedelta(hours=1)
+
+# Upload retries: exponential backoff (0.5s, 1s, ...) with +/-25% jitter
+UPLOAD_MAX_ATTEMPTS = 3
+UPLOAD_RETRY_BASE_DELAY = 0.5
+
+# Processing-state polling: 0.5s, 1s, 2s, ... capped at 10s
+PROCESSING_POLL_INITIAL_DELAY = 0.5
+PROCESSING_POLL_MAX_DELAY = 10.0
+
+# Smallest prompt prefix (tokens) Gemini accepts as an explicit cache
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+# Upload MIME types by file extension
+MIME_TYPES = {
+    # Video types
+    ".mp4": "video/mp4",
+    ".mov": "video/quicktime",
+    ".avi": "video/x-msvideo",
+    ".mkv": "video/x-matroska",
+    ".webm": "video/webm",
+    # Audio types
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+    ".m4a": "audio/mp4",
+    ".aac": "audio/aac",
+    ".ogg": "audio/ogg",
+    ".flac": "audio/flac",
+}
+
+
+def _retry_delay(attempt: int) -> float:
+    """Backoff delay in seconds before retrying after the given attempt."""
+    delay = UPLOAD_RETRY_BASE_DELAY * 2 ** (attempt - 1)
+    return delay * random.uniform(0.75, 1.25)
+
 
 class GeminiClient:
     """Client for interacting with the Gemini API."""
@@ -22,66 +68,208 @@ class GeminiClient:
         self.client = genai.Client(api_key=settings.gemini_api_key)
         self.model = settings.gemini_model
         self.video_fps = settings.video_fps
+
+        # Uploaded file names keyed by content hash, persisted across restarts
+        self.reuse_uploads = settings.reuse_uploads
+        self._uploads_path = settings.response_cache_dir.expanduser() / "uploads.json"
+        self._upload_cache: dict[str, str] = self._load_upload_cache()
+        self._upload_lock = threading.Lock()
+
+        # Explicit context caches of static prompt prefixes:
+        # prefix hash -> (cache name or None if creation failed, refresh time)
+        self.prompt_cache_ttl = settings.prompt_cache_ttl
+        self._prompt_caches: dict[str, tuple[str | None, float]] = {}
+        self._prompt_cache_lock = threading.Lock()
+
         logger.info(f"Initialized Gemini client with model: {self.model}, FPS: {self.video_fps}")
 
+    def _load_upload_cache(self) -> dict[str, str]:
+        """Load the content-hash to uploaded-file-name mapping from disk."""
+        if not self.reuse_uploads:
+            return {}
+        try:
+            return orjson.loads(self._uploads_path.read_bytes())
+        except (OSError, ValueError):
+            return {}
+
+    def _save_upload_cache(self) -> None:
+        """
+        Persist the upload mapping (caller holds the upload lock).
+
+        Workers share the file, so it's written under a unique name and
+        renamed into place; readers never see a half-written mapping.
+        """
+        tmp_path = self._uploads_path.with_name(
+            f"{self._uploads_path.stem}.{uuid.uuid4().hex[:8]}.tmp"
+        )
+        try:
+            self._uploads_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(orjson.dumps(self._upload_cache))
+            os.replace(tmp_path, self._uploads_path)
+        except OSError as e:
+            tmp_path.unlink(missing_ok=True)
+            logger.warning(f"Failed to save upload cache: {e}")
+
+    def _get_reusable_upload(self, file_hash: str) -> types.File | None:
+        """Return a previously uploaded file if it's still active and fresh."""
+        with self._upload_lock:
+            name = self._upload_cache.get(file_hash)
+        if name is None:
+            return None
+
+        try:
+            uploaded_file = self.client.files.get(name=name)
+        except Exception:
+            uploaded_file = None
+
+        expires_at = uploaded_file.expiration_time if uploaded_file else None
+        if (
+            uploaded_file is not None
+            and uploaded_file.state == "ACTIVE"
+            and (
+                expires_at is None
+                or expires_at - datetime.now(timezone.utc) > UPLOAD_REUSE_MARGIN
+            )
+        ):
+            return uploaded_file
+
+        with self._upload_lock:
+            self._upload_cache.pop(file_hash, None)
+            self._save_upload_cache()
+        return None
+
     def upload_file(self, file_path: Path) -> types.File:
         """
         Upload a file (video or audio) to Gemini File API.
 
+        If the same content was uploaded before and the Gemini copy is still
+        active, that file is returned instead of uploading again.
+
         Args:
             file_path: Path to the file
 
         Returns:
             Uploaded file object
         """
-        logger.info(f"📤 Uploading file: {file_path.name}")
-        
-        # Determine MIME type based on extension
-        extension = file_path.suffix.lower()
-        mime_types = {
-            # Video types
-            ".mp4": "video/mp4",
-            ".mov": "video/quicktime",
-            ".avi": "video/x-msvideo",
-            ".mkv": "video/x-matroska",
-            ".webm": "video/webm",
-            # Audio types
-            ".mp3": "audio/mpeg",
-            ".wav": "audio/wav",
-            ".m4a": "audio/mp4",
-            ".aac": "audio/aac",
-            ".ogg": "audio/ogg",
-            ".flac": "audio/flac",
-        }
-        mime_type = mime_types.get(extension, "application/octet-stream")
-        logger.debug(f"MIME type: {mime_type}")
+        file_hash = None
+        if self.reuse_uploads:
+            file_hash = hash_file(file_path)
+            uploaded_file = self._get_reusable_upload(file_hash)
+            if uploaded_file is not None:
+                logger.info(f"♻️ Reusing uploaded file for: {file_path.name}")
+                return uploaded_file
 
-        # Get file size for logging
-        file_size = file_path.stat().st_size / (1024 * 1024)  # MB
-        logger.info(f"   File size: {file_size:.1f}MB")
+        mime_type = self._prepare_upload(file_path)
 
         # Upload file
         start_time = time.time()
-        uploaded_file = self.client.files.upload(
-            file=file_path,
-            config=types.UploadFileConfig(mime_type=mime_type),
-        )
+        for attempt in range(1, UPLOAD_MAX_ATTEMPTS + 1):
+            try:
+                uploaded_file = self.client.files.upload(
+                    file=file_path,
+                    config=types.UploadFileConfig(mime_type=mime_type),
+                )
+                break
+            except Exception as e:
+                if attempt == UPLOAD_MAX_ATTEMPTS:
+                    raise
+                delay = _retry_delay(attempt)
+                logger.warning(f"Upload attempt {attempt} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
         logger.info(f"📤 Upload started, waiting for processing...")
 
-        # Wait for file to be processed
+        # Wait for file to be processed, backing off between checks
+        delay = PROCESSING_POLL_INITIAL_DELAY
         while uploaded_file.state == "PROCESSING":
-            time.sleep(2)
+            time.sleep(delay + random.random() * 0.1)
+            delay = min(delay * 2, PROCESSING_POLL_MAX_DELAY)
             uploaded_file = self.client.files.get(name=uploaded_file.name)
             logger.debug(f"Processing state: {uploaded_file.state}")
 
-        elapsed = time.time() - start_time
+        self._finish_upload(uploaded_file, file_hash, time.time() - start_time)
+        return uploaded_file
+
+    async def upload_file_async(self, file_path: Path) -> types.File:
+        """
+        Upload a file to Gemini File API without blocking the event loop.
+
+        Same behavior as upload_file, using the SDK's async client.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            Uploaded file object
+        """
+        file_hash = None
+        if self.reuse_uploads:
+            file_hash = await asyncio.to_thread(hash_file, file_path)
+            uploaded_file = await asyncio.to_thread(self._get_reusable_upload, file_hash)
+            if uploaded_file is not None:
+                logger.info(f"♻️ Reusing uploaded file for: {file_path.name}")
+                return uploaded_file
+
+        mime_type = self._prepare_upload(file_path)
+
+        start_time = time.time()
+        for attempt in range(1, UPLOAD_MAX_ATTEMPTS + 1):
+            try:
+                uploaded_file = await self.client.aio.files.upload(
+                    file=file_path,
+                    config=types.UploadFileConfig(mime_type=mime_type),
+                )
+                break
+            except Exception as e:
+                if attempt == UPLOAD_MAX_ATTEMPTS:
+                    raise
+                delay = _retry_delay(attempt)
+                logger.warning(f"Upload attempt {attempt} failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        logger.info(f"📤 Upload started, waiting for processing...")
+
+        delay = PROCESSING_POLL_INITIAL_DELAY
+        while uploaded_file.state == "PROCESSING":
+            await asyncio.sleep(delay + random.random() * 0.1)
+            delay = min(delay * 2, PROCESSING_POLL_MAX_DELAY)
+            uploaded_file = await self.client.aio.files.get(name=uploaded_file.name)
+            logger.debug(f"Processing state: {uploaded_file.state}")
+
+        await asyncio.to_thread(
+            self._finish_upload, uploaded_file, file_hash, time.time() - start_time
+        )
+        return uploaded_file
+
+    def _prepare_upload(self, file_path: Path) -> str:
+        """Log the upload and return the MIME type for a file."""
+        logger.info(f"📤 Uploading file: {file_path.name}")
         
+        # Determine MIME type based on extension
+        mime_type = MIME_TYPES.get(file_path.suffix.lower(), "application/octet-stream")
+        logger.debug(f"MIME type: {mime_type}")
+
+        # Get file size for logging
+        file_size = file_path.stat().st_size / (1024 * 1024)  # MB
+        logger.info(f"   File size: {file_size:.1f}MB")
+
+        return mime_type
+
+    def _finish_upload(
+        self,
+        uploaded_file: types.File,
+        file_hash: str | None,
+        elapsed: float,
+    ) -> None:
+        """Check the processed upload and record it for reuse."""
         if uploaded_file.state == "FAILED":
             logger.error(f"❌ File processing failed: {uploaded_file.name}")
             raise RuntimeError(f"File processing failed: {uploaded_file.name}")
 
         logger.info(f"✅ File uploaded successfully in {elapsed:.1f}s")
-        return uploaded_file
+
+        if file_hash is not None:
+            with self._upload_lock:
+                self._upload_cache[file_hash] = uploaded_file.name
+                self._save_upload_cache()
 
     def upload_video(self, video_path: Path) -> types.File:
         """
@@ -105,6 +293,7 @@ class GeminiClient:
         file: types.File | None = None,
         response_schema: dict[str, Any] | None = None,
         use_video_metadata: bool = False,
+        static_prefix: str | None = None,
     ) -> str:
         """
         Generate content using Gemini model.
@@ -114,13 +303,84 @@ class GeminiClient:
             file: Optional uploaded file (video or audio)
             response_schema: Optional JSON schema for structured output
             use_video_metadata: Whether to use video metadata (FPS) for video files
+            static_prefix: Leading part of the prompt that never changes; it's
+                served from an explicit context cache when one can be created
 
         Returns:
             Generated content as string
         """
         logger.info(f"🤖 Generating content with {self.model}...")
         start_time = time.time()
+
+        cached_content = None
+        if static_prefix and prompt.startswith(static_prefix):
+            cached_content = self._get_prompt_cache(static_prefix)
+            if cached_content:
+                prompt = prompt[len(static_prefix):]
+
+        contents, config = self._build_request(
+            prompt, file, response_schema, use_video_metadata, cached_content
+        )
+
+        # Generate content
+        response = self.client.models.generate_content(
+            model=self.model,
+            contents=contents,
+            config=config,
+        )
+
+        elapsed = time.time() - start_time
+        logger.info(f"✅ Content generated in {elapsed:.1f}s")
         
+        return response.text
+
+    async def generate_content_async(
+        self,
+        prompt: str,
+        file: types.File | None = None,
+        response_schema: dict[str, Any] | None = None,
+        use_video_metadata: bool = False,
+        static_prefix: str | None = None,
+    ) -> str:
+        """
+        Generate content without blocking the event loop.
+
+        Same arguments and result as generate_content, using the SDK's
+        async client.
+        """
+        logger.info(f"🤖 Generating content with {self.model}...")
+        start_time = time.time()
+
+        cached_content = None
+        if static_prefix and prompt.startswith(static_prefix):
+            cached_content = await asyncio.to_thread(self._get_prompt_cache, static_prefix)
+            if cached_content:
+                prompt = prompt[len(static_prefix):]
+
+        contents, config = self._build_request(
+            prompt, file, response_schema, use_video_metadata, cached_content
+        )
+
+        response = await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=contents,
+            config=config,
+        )
+
+        elapsed = time.time() - start_time
+        logger.info(f"✅ Content generated in {elapsed:.1f}s")
+
+        return response.text
+
+    def _build_request(
+        self,
+        prompt: str,
+        file: types.File | None,
+        response_schema: dict[str, Any] | None,
+        use_video_metadata: bool,
+        cached_content: str | None = None,
+    ) -> tuple[list[types.Content], types.GenerateContentConfig | None]:
+        """Build the contents and config for a generate_content call."""
         parts = []
 
         # Add file
@@ -143,25 +403,90 @@ class GeminiClient:
         parts.append(types.Part(text=prompt))
 
         # Configure response
-        config = None
+        config_fields: dict[str, Any] = {}
+        if cached_content:
+            logger.debug(f"Using cached prompt prefix: {cached_content}")
+            config_fields["cached_content"] = cached_content
         if response_schema:
             logger.debug("Using structured JSON output")
-            config = types.GenerateContentConfig(
-                response_mime_type="application/json",
-                response_schema=response_schema,
+            config_fields["response_mime_type"] = "application/json"
+            config_fields["response_schema"] = response_schema
+
+        config = types.GenerateContentConfig(**config_fields) if config_fields else None
+        return [types.Content(role="user", parts=parts)], config
+
+    def _get_prompt_cache(self, prefix: str) -> str | None:
+        """
+        Get (or create) an explicit context cache holding a static prompt prefix.
+
+        Prefixes below the model's minimum cacheable size are never sent
+        to caches.create. Other failures are remembered for one TTL so they
+        aren't retried on every call; callers send the full prompt instead.
+
+        Args:
+            prefix: Static prompt text to cache
+
+        Returns:
+            Cached content name, or None if caching is unavailable
+        """
+        if self.prompt_cache_ttl <= 0:
+            return None
+
+        key = hashlib.sha256(f"{self.model}\0{prefix}".encode()).hexdigest()
+        now = time.monotonic()
+        with self._prompt_cache_lock:
+            entry = self._prompt_caches.get(key)
+        if entry is not None and now < entry[1]:
+            return entry[0]
+
+        try:
+            tokens = self.client.models.count_tokens(
+                model=self.model, contents=prefix
+            ).total_tokens or 0
+            if tokens < PROMPT_CACHE_MIN_TOKENS:
+                logger.debug(
+                    f"Prompt prefix too small to cache ({tokens} tokens), sending full prompt"
+                )
+                # The prefix is part of the key, so this can never change
+                with self._prompt_cache_lock:
+                    self._prompt_caches[key] = (None, float("inf"))
+                return None
+
+            cache = self.client.caches.create(
+                model=self.model,
+                config=types.CreateCachedContentConfig(
+                    contents=[types.Content(role="user", parts=[types.Part(text=prefix)])],
+                    ttl=f"{self.prompt_cache_ttl}s",
+                ),
             )
+            name = cache.name
+            # Refresh a minute early so requests never reference an expired cache
+            refresh_at = now + max(self.prompt_cache_ttl - 60, 0)
+            logger.info(f"🗄️ Created prompt cache: {name}")
+        except Exception as e:
+            logger.debug(f"Prompt caching unavailable, sending full prompt: {e}")
+            name = None
+            refresh_at = now + self.prompt_cache_ttl
 
-        # Generate content
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=[types.Content(parts=parts)],
-            config=config,
-        )
+        with self._prompt_cache_lock:
+            self._prompt_caches[key] = (name, refresh_at)
+        return name
 
-        elapsed = time.time() - start_time
-        logger.info(f"✅ Content generated in {elapsed:.1f}s")
-        
-        return response.text
+    def release_file(self, file: types.File) -> None:
+        """
+        Release an uploaded file once a pipeline stage is done with it.
+
+        With upload reuse enabled (opt-in) the file is kept for later stages
+        and Gemini expires it on its own, about 48 hours later, even if the
+        video is deleted here; otherwise it's deleted right away.
+
+        Args:
+            file: File object to release
+        """
+        if self.reuse_uploads:
+            logger.debug(f"Keeping uploaded file for reuse: {file.name}")
+            return
+        self.delete_file(file)
 
     def delete_file(self, file: types.File) -> None:
         """
@@ -179,11 +504,15 @@ class GeminiClient:
 
 # Singleton instance
 _gemini_client: GeminiClient | None = None
+_gemini_client_lock = threading.Lock()
 
 
 def get_gemini_client() -> GeminiClient:
     """Get or create the Gemini client instance."""
     global _gemini_client
     if _gemini_client is None:
-        _gemini_client = GeminiClient()
+        # Double-checked so concurrent first calls build only one instance
+        with _gemini_client_lock:
+            if _gemini_client is None:
+                _gemini_client = GeminiClient()
     return _gemini_client
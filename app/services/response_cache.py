@@ -0,0 +1,234 @@
+"""On-disk cache of AI pipeline results keyed by source content."""
+
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+
+from app.config import get_settings
+from app.utils.file_manager import hash_file
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Bump when cached result formats change so stale entries are ignored
+CACHE_VERSION = "v1"
+
+# Minimum loudness-envelope correlation for two audio tracks to count as
+# the same recording, how far their lengths may differ (seconds), and the
+# largest mean level difference (dB) a re-encode is expected to introduce
+SIMILAR_AUDIO_THRESHOLD = 0.98
+SIMILAR_AUDIO_LENGTH_TOLERANCE = 1
+SIMILAR_AUDIO_MAX_LEVEL_DIFF = 3.0
+
+# Shorter envelopes carry too little signal to tell recordings apart
+# (seconds of audio)
+SIMILAR_AUDIO_MIN_LENGTH = 120
+
+
+def _correlation(a: list[float], b: list[float]) -> float:
+    """Pearson correlation of two envelopes over their common length."""
+    n = min(len(a), len(b))
+    if n < 2:
+        return 0.0
+    a, b = a[:n], b[:n]
+    mean_a, mean_b = sum(a) / n, sum(b) / n
+    cov = sum((x - mean_a) * (y - mean_b) for x, y in zip(a, b))
+    var_a = sum((x - mean_a) ** 2 for x in a)
+    var_b = sum((y - mean_b) ** 2 for y in b)
+    if var_a == 0 or var_b == 0:
+        return 0.0
+    return cov / math.sqrt(var_a * var_b)
+
+
+def _mean_level_difference(a: list[float], b: list[float]) -> float:
+    """Mean absolute difference (dB) of two envelopes over their common length."""
+    n = min(len(a), len(b))
+    if n == 0:
+        return math.inf
+    return sum(abs(x - y) for x, y in zip(a, b)) / n
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache for deterministic pipeline results.
+
+    Entries are keyed by the SHA-256 of the source video plus a hash of the
+    model and prompt, so re-processing the same video with the same settings
+    skips audio extraction, upload and the Gemini calls entirely.
+
+    Audio fingerprints of cached sources are kept as well, so a re-encoded
+    copy of a video (different bytes, same recording) can reuse the results.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        enabled: bool = True,
+        match_similar: bool = True,
+    ):
+        """
+        Initialize the response cache.
+
+        Args:
+            cache_dir: Directory holding the cache database
+            enabled: Whether lookups and writes are performed at all
+            match_similar: Whether to match re-encoded copies by fingerprint
+        """
+        self.cache_dir = cache_dir.expanduser()
+        self.enabled = enabled
+        self.match_similar = enabled and match_similar
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(
+                self.cache_dir / "responses.sqlite3",
+                check_same_thread=False,
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS fingerprints ("
+                "source TEXT PRIMARY KEY, length INTEGER NOT NULL, fingerprint BLOB NOT NULL)"
+            )
+            self._conn.commit()
+
+    def make_key(self, file_path: Path | None, stage: str, *params: str) -> str:
+        """
+        Build a cache key for a pipeline stage.
+
+        Args:
+            file_path: Source video the result was derived from, or None for
+                text-only stages (the text must then be part of params)
+            stage: Pipeline stage name (e.g., "transcript", "shorts")
+            *params: Anything else the result depends on (model, prompt, ...)
+
+        Returns:
+            Cache key string
+        """
+        source = hash_file(file_path) if file_path is not None else "text"
+        return self._source_key(source, stage, params)
+
+    @staticmethod
+    def _source_key(source: str, stage: str, params: tuple[str, ...]) -> str:
+        """Build a cache key from a source hash, stage and parameters."""
+        params_hash = hashlib.sha256("\0".join(params).encode()).hexdigest()[:16]
+        return f"{source}.{stage}.{params_hash}.{CACHE_VERSION}"
+
+    def get(self, key: str) -> str | None:
+        """Get a cached result, or None on a miss."""
+        if self._conn is None:
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        logger.info(f"♻️ Cache hit: {key}")
+        return row[0]
+
+    def set(self, key: str, content: str) -> None:
+        """Store a result, replacing any previous entry for the key."""
+        if self._conn is None:
+            return
+
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, created_at) "
+                    "VALUES (?, ?, ?)",
+                    (key, content, time.time()),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to write cache entry {key}: {e}")
+
+    def get_similar(
+        self,
+        fingerprint: list[float],
+        stage: str,
+        *params: str,
+    ) -> str | None:
+        """
+        Get a result cached for a different file with matching audio.
+
+        Args:
+            fingerprint: Audio fingerprint of the file being processed
+            stage: Pipeline stage name
+            *params: Same parameters as passed to make_key
+
+        Returns:
+            Cached result, or None if no similar source has one
+        """
+        if not self.match_similar or len(fingerprint) < SIMILAR_AUDIO_MIN_LENGTH:
+            return None
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, fingerprint FROM fingerprints WHERE length BETWEEN ? AND ?",
+                (
+                    len(fingerprint) - SIMILAR_AUDIO_LENGTH_TOLERANCE,
+                    len(fingerprint) + SIMILAR_AUDIO_LENGTH_TOLERANCE,
+                ),
+            ).fetchall()
+
+        best_source, best_score = None, SIMILAR_AUDIO_THRESHOLD
+        for source, blob in rows:
+            candidate = array("f", blob).tolist()
+            score = _correlation(fingerprint, candidate)
+            if (
+                score >= best_score
+                and _mean_level_difference(fingerprint, candidate) <= SIMILAR_AUDIO_MAX_LEVEL_DIFF
+            ):
+                best_source, best_score = source, score
+
+        if best_source is None:
+            return None
+
+        logger.info(f"🔗 Audio matches a cached source (correlation {best_score:.3f})")
+        return self.get(self._source_key(best_source, stage, params))
+
+    def add_fingerprint(self, file_path: Path, fingerprint: list[float]) -> None:
+        """Record the audio fingerprint of a source whose results are cached."""
+        if not self.match_similar or len(fingerprint) < SIMILAR_AUDIO_MIN_LENGTH:
+            return
+
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO fingerprints (source, length, fingerprint) "
+                    "VALUES (?, ?, ?)",
+                    (hash_file(file_path), len(fingerprint), array("f", fingerprint).tobytes()),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to store audio fingerprint: {e}")
+
+
+# Singleton instance
+_response_cache: ResponseCache | None = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Get or create the response cache instance."""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                settings = get_settings()
+                _response_cache = ResponseCache(
+                    cache_dir=settings.response_cache_dir,
+                    enabled=settings.response_cache_enabled,
+                    match_similar=settings.similar_audio_cache,
+                )
+    return _response_cache
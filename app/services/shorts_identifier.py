@@ -1,21 +1,44 @@
 """AI-powered shorts identification service."""
 
-import json
+import asyncio
+import io
+import threading
+from functools import lru_cache
 from pathlib import Path
 
+import orjson
 from google.genai import types
 
 from app.config import get_settings
 from app.services.gemini_client import get_gemini_client
 from app.services.context_optimizer import optimize_segment_starts
+from app.services.response_cache import get_response_cache
 from app.schemas.transcription import Transcription
 from app.schemas.shorts import ShortsAnalysis, PotentialShort
-from app.utils.time_utils import parse_timestamp, calculate_duration
-from app.utils.audio import ensure_audio_exists
+from app.utils.time_utils import (
+    calculate_duration,
+    format_timestamp_hms,
+    parse_timestamp,
+)
+from app.utils.audio import (
+    audio_fingerprint,
+    ensure_audio_exists,
+    ensure_audio_exists_async,
+    find_silence_before,
+)
 from app.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Furthest an optimized start may move back from the original start (seconds)
+MAX_CONTEXT_LOOKBACK = 10
+
+# Shorts sharing at least this fraction of the shorter clip are duplicates
+MAX_OVERLAP_RATIO = 0.5
+
+# Upper bound on shorts per response (the routes cap max_shorts to this)
+MAX_SHORTS_PER_RESPONSE = 20
+
 
 # Schema for structured shorts identification output
 SHORTS_SCHEMA = types.Schema(
@@ -23,17 +46,20 @@ SHORTS_SCHEMA = types.Schema(
     properties={
         "video_summary": types.Schema(
             type=types.Type.STRING,
-            description="Brief summary of the source content.",
+            description="Brief summary of the source content (at most 3 sentences).",
+            max_length=500,
         ),
         "shorts": types.Schema(
             type=types.Type.ARRAY,
             description="List of potential YouTube Shorts segments.",
+            max_items=MAX_SHORTS_PER_RESPONSE,
             items=types.Schema(
                 type=types.Type.OBJECT,
                 properties={
                     "title": types.Schema(
                         type=types.Type.STRING,
                         description="Catchy, engaging title for the short (max 100 chars).",
+                        max_length=100,
                     ),
                     "start_time": types.Schema(
                         type=types.Type.STRING,
@@ -43,28 +69,38 @@ SHORTS_SCHEMA = types.Schema(
                         type=types.Type.STRING,
                         description="End timestamp in HH:MM:SS format (e.g., 00:02:15).",
                     ),
+                    "optimized_start": types.Schema(
+                        type=types.Type.STRING,
+                        description="Start of the sentence containing start_time, at most 10 seconds earlier, in HH:MM:SS format.",
+                    ),
                     "hook": types.Schema(
                         type=types.Type.STRING,
-                        description="Description of the opening hook (first 3 seconds).",
+                        description="Description of the opening hook (first 3 seconds), one sentence.",
+                        max_length=200,
                     ),
                     "content_summary": types.Schema(
                         type=types.Type.STRING,
-                        description="Brief description of what happens in this segment.",
+                        description="What happens in this segment, in at most 25 words.",
+                        max_length=200,
                     ),
                     "virality_score": types.Schema(
                         type=types.Type.NUMBER,
                         description="Virality potential score from 0 to 100.",
+                        minimum=0,
+                        maximum=100,
                     ),
                     "virality_reasons": types.Schema(
                         type=types.Type.ARRAY,
-                        description="List of reasons why this could go viral.",
-                        items=types.Schema(type=types.Type.STRING),
+                        description="Up to 4 short reasons why this could go viral.",
+                        max_items=4,
+                        items=types.Schema(type=types.Type.STRING, max_length=100),
                     ),
                 },
                 required=[
                     "title",
                     "start_time",
                     "end_time",
+                    "optimized_start",
                     "hook",
                     "content_summary",
                     "virality_score",
@@ -77,17 +113,13 @@ SHORTS_SCHEMA = types.Schema(
 )
 
 
-def get_shorts_identification_prompt(
-    min_duration: int,
-    max_duration: int,
-    max_shorts: int,
-) -> str:
-    """Generate the prompt for shorts identification."""
-    return f"""
+# Static instructions, kept byte-identical across calls so the prompt prefix
+# can be reused by Gemini's prefix caching. Per-request values go last.
+SHORTS_IDENTIFICATION_INSTRUCTIONS = """
 Analyze this audio content and identify the best segments for YouTube Shorts.
 
 ## YouTube Shorts Requirements:
-- Duration: {min_duration}-{max_duration} seconds (strictly enforced)
+- Duration: within the range given under Request Parameters (strictly enforced)
 - Must have a strong opening hook in the first 3 seconds
 - **MUST be completely self-contained with proper context**
 
@@ -130,13 +162,21 @@ GOOD examples (aim for these):
 
 ## Instructions:
 
-1. Identify up to {max_shorts} potential shorts from the audio
-2. Each short must be between {min_duration} and {max_duration} seconds
+1. Identify up to the number of shorts given under Request Parameters
+2. Each short must be within the duration range given under Request Parameters
 3. **Extend start time earlier if needed to capture context setup**
 4. Provide PRECISE timestamps in HH:MM:SS format
 5. Score each segment 0-100 based on viral potential
 6. Rank shorts by virality_score (highest first)
 
+## Context Alignment (optimized_start):
+For EACH short, also return optimized_start:
+- Listen from about 10 seconds BEFORE start_time and find the nearest COMPLETE SENTENCE BREAK
+- optimized_start must be at the START of a sentence (after a pause, period, or natural break)
+- Do NOT go back more than 10 seconds from start_time
+- If start_time is already at a sentence break, return it unchanged
+- optimized_start must NEVER be after start_time
+
 ## IMPORTANT:
 - Timestamps must be accurate to the actual audio timing
 - Ensure segments don't overlap
@@ -145,6 +185,35 @@ GOOD examples (aim for these):
 """
 
 
+@lru_cache(maxsize=16)
+def _shorts_prompt_prefix(min_duration: int, max_duration: int, max_shorts: int) -> str:
+    """Build the transcript-free part of the prompt (memoized per settings)."""
+    return f"""{SHORTS_IDENTIFICATION_INSTRUCTIONS}
+## Request Parameters:
+- Identify up to {max_shorts} shorts
+- Each short must be between {min_duration} and {max_duration} seconds
+"""
+
+
+def get_shorts_identification_prompt(
+    min_duration: int,
+    max_duration: int,
+    max_shorts: int,
+    transcript: str | None = None,
+) -> str:
+    """
+    Generate the prompt for shorts identification.
+
+    The static instructions come first, then the per-request parameters,
+    then the transcript if there is one. Only the transcript-free part is
+    memoized, so large transcripts are neither hashed nor retained.
+    """
+    prefix = _shorts_prompt_prefix(min_duration, max_duration, max_shorts)
+    if not transcript:
+        return prefix
+    return f"{prefix}\n## Audio Transcription:\n\n{transcript}\n"
+
+
 class ShortsIdentifierService:
     """Service for identifying potential YouTube Shorts from videos."""
 
@@ -152,12 +221,16 @@ class ShortsIdentifierService:
         """Initialize the shorts identifier service."""
         self.client = get_gemini_client()
         self.settings = get_settings()
+        self.cache = get_response_cache()
+        # Strong references so fire-and-forget cleanup isn't garbage collected
+        self._background_tasks: set[asyncio.Task] = set()
         logger.info("ShortsIdentifierService initialized")
 
-    def identify_shorts_from_video(
+    async def identify_shorts_from_video(
         self,
         video_path: Path,
         max_shorts: int | None = None,
+        uploaded_file: types.File | None = None,
     ) -> ShortsAnalysis:
         """
         Identify potential shorts from a video file by analyzing its audio.
@@ -165,6 +238,8 @@ class ShortsIdentifierService:
         Args:
             video_path: Path to the video file
             max_shorts: Maximum number of shorts to identify
+            uploaded_file: Audio already uploaded by the caller, who then
+                owns releasing it
 
         Returns:
             ShortsAnalysis with ranked potential shorts
@@ -173,61 +248,172 @@ class ShortsIdentifierService:
         logger.info(f"🔍 Starting shorts identification for: {video_path.name}")
         logger.info(f"   Settings: max_shorts={max_shorts}, duration={self.settings.min_short_duration}-{self.settings.max_short_duration}s")
 
+        prompt, cache_params = self._video_prompt(max_shorts)
+
+        # Reuse a previous result for the same video and settings, checked
+        # before any audio is extracted or uploaded
+        cache_key = await asyncio.to_thread(
+            self.cache.make_key, video_path, "shorts", *cache_params
+        )
+        cached = await asyncio.to_thread(self.cache.get, cache_key)
+        if cached is not None:
+            return ShortsAnalysis.model_validate_json(cached)
+
         # Extract audio from video (much smaller file = faster upload)
         logger.info("Step 1/4: Extracting audio from video...")
-        audio_path = ensure_audio_exists(video_path)
+        audio_path = await ensure_audio_exists_async(video_path)
+
+        # Or for a re-encoded copy of the same recording
+        fingerprint = []
+        if self.cache.match_similar:
+            fingerprint = await asyncio.to_thread(audio_fingerprint, audio_path)
+            cached = await asyncio.to_thread(
+                self.cache.get_similar, fingerprint, "shorts", *cache_params
+            )
+            if cached is not None:
+                await asyncio.to_thread(self.cache.set, cache_key, cached)
+                return ShortsAnalysis.model_validate_json(cached)
 
-        # Upload audio to Gemini
-        logger.info("Step 2/4: Uploading audio to Gemini...")
-        uploaded_file = self.client.upload_audio(audio_path)
+        # Upload audio to Gemini (unless the caller shares its upload)
+        owns_upload = uploaded_file is None
+        if owns_upload:
+            logger.info("Step 2/4: Uploading audio to Gemini...")
+            uploaded_file = await self.client.upload_file_async(audio_path)
 
         try:
             logger.info("Step 3/4: Analyzing audio for viral segments...")
-            prompt = get_shorts_identification_prompt(
-                min_duration=self.settings.min_short_duration,
-                max_duration=self.settings.max_short_duration,
-                max_shorts=max_shorts,
-            )
-
-            response = self.client.generate_content(
+            response = await self.client.generate_content_async(
                 prompt=prompt,
                 file=uploaded_file,
                 response_schema=SHORTS_SCHEMA,
                 use_video_metadata=False,  # Audio doesn't need video metadata
+                static_prefix=SHORTS_IDENTIFICATION_INSTRUCTIONS,
             )
 
             logger.info("Step 4/5: Parsing and validating shorts...")
-            data = json.loads(response)
+            data = orjson.loads(response)
             analysis = self._parse_shorts_analysis(data)
             
-            # Step 5: Optimize start times to find sentence breaks
-            # Reuse the already-uploaded audio file (no re-upload needed)
-            if analysis.shorts:
+            # Step 5 (optional): Re-check sentence breaks
+            # Start times are already aligned via optimized_start in step 3
+            if analysis.shorts and self.settings.context_optimization_pass:
                 logger.info("Step 5/5: Optimizing start times for context...")
-                segments = [
-                    {"start_time": s.start_time, "end_time": s.end_time}
-                    for s in analysis.shorts
-                ]
-                optimized = optimize_segment_starts(segments, uploaded_file)
-                
-                # Apply optimized start times back to shorts
-                for short, opt_seg in zip(analysis.shorts, optimized):
-                    if short.start_time != opt_seg["start_time"]:
-                        short.start_time = opt_seg["start_time"]
-                        short.duration_seconds = opt_seg.get(
-                            "duration_seconds", 
-                            calculate_duration(opt_seg["start_time"], short.end_time)
-                        )
+                await self._optimize_starts(analysis.shorts, audio_path, uploaded_file)
             
             logger.info(f"✅ Shorts identification complete: {len(analysis.shorts)} shorts found")
             for i, short in enumerate(analysis.shorts):
                 logger.info(f"   [{i+1}] {short.start_time} - {short.end_time} | Score: {short.virality_score} | {short.title[:50]}...")
-            
+
+            await asyncio.to_thread(
+                self.cache.set, cache_key, analysis.model_dump_json()
+            )
+            await asyncio.to_thread(self.cache.add_fingerprint, video_path, fingerprint)
             return analysis
 
         finally:
-            logger.debug("Cleaning up uploaded file...")
-            self.client.delete_file(uploaded_file)
+            if owns_upload:
+                # Release in the background so the caller doesn't wait on cleanup
+                logger.debug("Releasing uploaded file...")
+                task = asyncio.create_task(
+                    asyncio.to_thread(self.client.release_file, uploaded_file)
+                )
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+
+    def get_cached_analysis(
+        self,
+        video_path: Path,
+        max_shorts: int | None = None,
+    ) -> ShortsAnalysis | None:
+        """
+        Look up a previous shorts analysis of this exact video and settings.
+
+        Nothing is extracted or uploaded.
+
+        Args:
+            video_path: Path to the video file
+            max_shorts: Maximum number of shorts to identify
+
+        Returns:
+            The cached ShortsAnalysis, or None on a miss
+        """
+        max_shorts = max_shorts or self.settings.max_shorts_to_generate
+        _, cache_params = self._video_prompt(max_shorts)
+        cached = self.cache.get(self.cache.make_key(video_path, "shorts", *cache_params))
+        if cached is None:
+            return None
+        return ShortsAnalysis.model_validate_json(cached)
+
+    def _video_prompt(self, max_shorts: int) -> tuple[str, tuple[str, ...]]:
+        """Build the audio-analysis prompt and its response cache parameters."""
+        prompt = get_shorts_identification_prompt(
+            min_duration=self.settings.min_short_duration,
+            max_duration=self.settings.max_short_duration,
+            max_shorts=max_shorts,
+        )
+        cache_params = (
+            self.client.model,
+            prompt,
+            str(self.settings.context_optimization_pass),
+        )
+        return prompt, cache_params
+
+    async def _optimize_starts(
+        self,
+        shorts: list[PotentialShort],
+        audio_path: Path,
+        uploaded_file: types.File,
+    ) -> None:
+        """
+        Pull short starts back to the nearest pause in the audio.
+
+        Each start is snapped locally to the end of the longest silence in
+        the lookback window. Only shorts with no detectable pause fall back
+        to a Gemini pass, which reuses the already-uploaded audio file.
+        """
+        # Probe all lookback windows concurrently (one FFmpeg run each)
+        starts = [parse_timestamp(short.start_time) for short in shorts]
+        silence_ends = await asyncio.gather(*(
+            asyncio.to_thread(
+                find_silence_before, audio_path, start_seconds, MAX_CONTEXT_LOOKBACK
+            )
+            for start_seconds in starts
+        ))
+
+        unresolved = []
+        for short, start_seconds, silence_end in zip(shorts, starts, silence_ends):
+            if silence_end is None:
+                unresolved.append(short)
+            elif int(silence_end) < start_seconds:
+                self._set_start(short, format_timestamp_hms(silence_end))
+
+        if not unresolved:
+            return
+
+        logger.info(f"   No pause found for {len(unresolved)} shorts, asking Gemini...")
+        segments = [
+            {"start_time": s.start_time, "end_time": s.end_time}
+            for s in unresolved
+        ]
+        optimized = await optimize_segment_starts(segments, uploaded_file)
+        for short, opt_seg in zip(unresolved, optimized):
+            if short.start_time != opt_seg["start_time"]:
+                self._set_start(short, opt_seg["start_time"])
+
+    def _set_start(self, short: PotentialShort, start_time: str) -> None:
+        """
+        Move a short's start time and recalculate its duration.
+
+        The move is skipped if it would push the short past the maximum
+        duration.
+        """
+        duration = calculate_duration(start_time, short.end_time)
+        if duration > self.settings.max_short_duration:
+            logger.debug(f"   Keeping {short.start_time}: {start_time} would make it {duration}s")
+            return
+        logger.debug(f"   {short.start_time} → {start_time}")
+        short.start_time = start_time
+        short.duration_seconds = duration
 
     def identify_shorts_from_transcription(
         self,
@@ -255,17 +441,20 @@ class ShortsIdentifierService:
         # Format transcription for the prompt
         transcription_text = self._format_transcription(transcription)
 
-        prompt = f"""
-{get_shorts_identification_prompt(
-    min_duration=self.settings.min_short_duration,
-    max_duration=self.settings.max_short_duration,
-    max_shorts=max_shorts,
-)}
-
-## Audio Transcription:
+        prompt = get_shorts_identification_prompt(
+            min_duration=self.settings.min_short_duration,
+            max_duration=self.settings.max_short_duration,
+            max_shorts=max_shorts,
+            transcript=transcription_text,
+        )
 
-{transcription_text}
-"""
+        # The transcript is part of the prompt, so the key covers it
+        cache_key = self.cache.make_key(
+            video_path, "shorts-transcript", self.client.model, prompt
+        )
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return ShortsAnalysis.model_validate_json(cached)
 
         if video_path:
             # Use audio for context
@@ -278,30 +467,84 @@ class ShortsIdentifierService:
                     file=uploaded_file,
                     response_schema=SHORTS_SCHEMA,
                     use_video_metadata=False,
+                    static_prefix=SHORTS_IDENTIFICATION_INSTRUCTIONS,
                 )
             finally:
-                self.client.delete_file(uploaded_file)
+                self.client.release_file(uploaded_file)
         else:
             # Text-only analysis
             logger.info("Using text-only analysis (no audio context)")
             response = self.client.generate_content(
                 prompt=prompt,
                 response_schema=SHORTS_SCHEMA,
+                static_prefix=SHORTS_IDENTIFICATION_INSTRUCTIONS,
             )
 
-        data = json.loads(response)
-        return self._parse_shorts_analysis(data)
+        data = orjson.loads(response)
+        analysis = self._parse_shorts_analysis(data)
+        self.cache.set(cache_key, analysis.model_dump_json())
+        return analysis
 
     def _format_transcription(self, transcription: Transcription) -> str:
-        """Format transcription for prompt inclusion."""
-        lines = [f"Summary: {transcription.summary}", ""]
+        """
+        Format transcription for prompt inclusion.
 
+        Segments are already sentence-level blocks, so each one is sent as a
+        single "[start] text" line. End times are implied by the next line's
+        start and the speaker is only named when it changes, which keeps the
+        prompt compact on long videos.
+        """
+        buf = io.StringIO()
+        buf.write(f"Summary: {transcription.summary}\n")
+
+        speaker = None
         for seg in transcription.segments:
-            lines.append(
-                f"[{seg.start_time} - {seg.end_time}] {seg.speaker}: {seg.content}"
-            )
+            if seg.speaker != speaker:
+                speaker = seg.speaker
+                buf.write(f"\n[{seg.start_time}] {speaker}: {seg.content}")
+            else:
+                buf.write(f"\n[{seg.start_time}] {seg.content}")
 
-        return "\n".join(lines)
+        if transcription.segments:
+            buf.write(f"\n[{transcription.segments[-1].end_time}] (end)")
+
+        return buf.getvalue()
+
+    def _apply_optimized_start(self, start_time: str, optimized_start: str) -> str:
+        """Use the optimized start if it moves back by at most the lookback window."""
+        try:
+            moved_back = parse_timestamp(start_time) - parse_timestamp(optimized_start)
+        except ValueError:
+            return start_time
+
+        if 0 < moved_back <= MAX_CONTEXT_LOOKBACK:
+            logger.debug(f"   {start_time} → {optimized_start} (context alignment)")
+            return optimized_start
+        return start_time
+
+    def _drop_overlapping(self, shorts: list[PotentialShort]) -> list[PotentialShort]:
+        """
+        Remove near-duplicate shorts covering mostly the same passage.
+
+        Expects shorts ranked best first; a short overlapping a better one by
+        at least MAX_OVERLAP_RATIO of the shorter clip is dropped.
+        """
+        kept: list[tuple[PotentialShort, int, int]] = []
+        for short in shorts:
+            start = parse_timestamp(short.start_time)
+            end = parse_timestamp(short.end_time)
+            if any(
+                min(end, kept_end) - max(start, kept_start)
+                >= MAX_OVERLAP_RATIO * min(end - start, kept_end - kept_start)
+                for _, kept_start, kept_end in kept
+            ):
+                logger.debug(f"Skipping short: overlaps a higher-scored short ({short.title[:50]})")
+                continue
+            kept.append((short, start, end))
+
+        if len(kept) < len(shorts):
+            logger.info(f"   Dropped {len(shorts) - len(kept)} overlapping shorts")
+        return [short for short, _, _ in kept]
 
     def _parse_shorts_analysis(self, data: dict) -> ShortsAnalysis:
         """Parse raw data into ShortsAnalysis model."""
@@ -324,6 +567,15 @@ class ShortsIdentifierService:
                     skipped += 1
                     continue
 
+                # Pull the start back to the sentence break Gemini found,
+                # unless that would take the short past the maximum
+                optimized_start = short_data.get("optimized_start")
+                if optimized_start:
+                    aligned_start = self._apply_optimized_start(start_time, optimized_start)
+                    aligned_duration = calculate_duration(aligned_start, end_time)
+                    if aligned_duration <= self.settings.max_short_duration:
+                        start_time, duration = aligned_start, aligned_duration
+
                 shorts.append(
                     PotentialShort(
                         title=short_data.get("title", "Untitled Short"),
@@ -346,6 +598,7 @@ class ShortsIdentifierService:
 
         # Sort by virality score (highest first)
         shorts.sort(key=lambda x: x.virality_score, reverse=True)
+        shorts = self._drop_overlapping(shorts)
 
         return ShortsAnalysis(
             video_summary=data.get("video_summary", ""),
@@ -356,11 +609,14 @@ class ShortsIdentifierService:
 
 # Singleton instance
 _shorts_identifier: ShortsIdentifierService | None = None
+_shorts_identifier_lock = threading.Lock()
 
 
 def get_shorts_identifier_service() -> ShortsIdentifierService:
     """Get or create the shorts identifier service instance."""
     global _shorts_identifier
     if _shorts_identifier is None:
-        _shorts_identifier = ShortsIdentifierService()
+        with _shorts_identifier_lock:
+            if _shorts_identifier is None:
+                _shorts_identifier = ShortsIdentifierService()
     return _shorts_identifier
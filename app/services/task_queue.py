@@ -0,0 +1,147 @@
+"""Background task queue for long-running shorts jobs."""
+
+import asyncio
+import threading
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.config import get_settings
+from app.schemas.shorts import TaskStatusResponse
+from app.services.cache import Cache, get_shorts_cache
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Statuses after which a task record no longer changes
+FINISHED_STATUSES = frozenset({"completed", "failed"})
+
+
+class TaskQueue:
+    """
+    Run jobs in the background and track their status by task ID.
+
+    Jobs run in the process that accepted them, but their status records
+    live in the shared cache backend, so with Redis any worker can answer
+    a status poll.
+    """
+
+    def __init__(self, backend: Cache, max_concurrent: int = 2, ttl: int = 3600):
+        """
+        Initialize the task queue.
+
+        Args:
+            backend: Cache backend storing the task records
+            max_concurrent: Maximum number of jobs running at once; further
+                jobs stay pending until a slot frees up
+            ttl: Seconds a task record is kept after its last update
+        """
+        self._backend = backend
+        self._ttl = ttl
+        self._slots = asyncio.Semaphore(max_concurrent)
+        # This process's unfinished records, so a backend eviction can't
+        # drop a job's result before it's written
+        self._active: dict[str, TaskStatusResponse] = {}
+        # Strong references so running jobs aren't garbage collected
+        self._running: set[asyncio.Task] = set()
+
+    @staticmethod
+    def _key(task_id: str) -> str:
+        """Build the backend key for a task record."""
+        return f"task:{task_id}"
+
+    async def submit(
+        self,
+        job: Callable[..., Awaitable[Any]],
+        *args: Any,
+        **kwargs: Any,
+    ) -> str:
+        """
+        Schedule a job on the running event loop.
+
+        Args:
+            job: Async callable doing the work; its return value is the result
+            *args: Positional arguments for the job
+            **kwargs: Keyword arguments for the job
+
+        Returns:
+            Task ID for status polling
+        """
+        task_id = str(uuid.uuid4())
+        self._active[task_id] = TaskStatusResponse(task_id=task_id)
+        await self._update(task_id)
+
+        task = asyncio.create_task(self._run(task_id, job, *args, **kwargs))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+        logger.debug("Queued task: %s", task_id)
+        return task_id
+
+    async def get(self, task_id: str) -> TaskStatusResponse | None:
+        """Get the status of a task, or None if unknown or expired."""
+        record = self._active.get(task_id)
+        if record is not None:
+            return record
+        raw = await self._backend.get_bytes(self._key(task_id))
+        if raw is None:
+            return None
+        return TaskStatusResponse.model_validate_json(raw)
+
+    async def _run(
+        self,
+        task_id: str,
+        job: Callable[..., Awaitable[Any]],
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        """Wait for a free slot, execute a job and record its outcome."""
+        async with self._slots:
+            await self._update(task_id, status="running")
+            try:
+                result = await job(*args, **kwargs)
+            except Exception as e:
+                logger.error("Task failed: %s: %s", task_id, e)
+                await self._update(task_id, status="failed", error=str(e))
+            else:
+                await self._update(task_id, status="completed", result=result)
+                logger.debug("Task completed: %s", task_id)
+
+    async def _update(self, task_id: str, **fields: Any) -> None:
+        """
+        Update a task record and write it to the backend.
+
+        If the write fails the record stays local, so this worker can still
+        answer polls for it.
+        """
+        record = self._active[task_id].model_copy(update=fields)
+        self._active[task_id] = record
+        try:
+            await self._backend.set_bytes(
+                self._key(task_id), record.model_dump_json().encode(), ttl=self._ttl
+            )
+        except Exception as e:
+            logger.warning("Could not store task %s: %s", task_id, e)
+            return
+        if record.status in FINISHED_STATUSES:
+            del self._active[task_id]
+
+
+# Singleton instance
+_task_queue: TaskQueue | None = None
+_task_queue_lock = threading.Lock()
+
+
+def get_task_queue() -> TaskQueue:
+    """Get or create the task queue instance."""
+    global _task_queue
+    if _task_queue is None:
+        with _task_queue_lock:
+            if _task_queue is None:
+                settings = get_settings()
+                _task_queue = TaskQueue(
+                    backend=get_shorts_cache().backend,
+                    max_concurrent=settings.task_workers,
+                    ttl=settings.shorts_cache_ttl,
+                )
+    return _task_queue
@@ -1,13 +1,15 @@
 """Video transcription service using Gemini API."""
 
-import json
+import threading
 from pathlib import Path
 
+import orjson
 from google.genai import types
 
 from app.services.gemini_client import get_gemini_client
+from app.services.response_cache import get_response_cache
 from app.schemas.transcription import Transcription, TranscriptionSegment
-from app.utils.audio import ensure_audio_exists
+from app.utils.audio import audio_fingerprint, ensure_audio_exists
 from app.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -114,27 +116,52 @@ class TranscriptionService:
     def __init__(self):
         """Initialize the transcription service."""
         self.client = get_gemini_client()
+        self.cache = get_response_cache()
         logger.info("TranscriptionService initialized")
 
-    def transcribe_video(self, video_path: Path) -> Transcription:
+    def transcribe_video(
+        self,
+        video_path: Path,
+        uploaded_file: types.File | None = None,
+    ) -> Transcription:
         """
         Transcribe a video file by extracting and analyzing its audio.
 
         Args:
             video_path: Path to the video file
+            uploaded_file: Audio already uploaded by the caller, who then
+                owns releasing it
 
         Returns:
             Transcription object with segments
         """
         logger.info(f"🎙️ Starting transcription for: {video_path.name}")
-        
+
+        # Reuse a previous transcription of the same video
+        cache_params = (self.client.model, TRANSCRIPTION_PROMPT)
+        cache_key = self.cache.make_key(video_path, "transcript", *cache_params)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return Transcription.model_validate_json(cached)
+
         # Extract audio from video (much smaller file = faster upload)
         logger.info("Step 1/4: Extracting audio from video...")
         audio_path = ensure_audio_exists(video_path)
 
-        # Upload audio to Gemini
-        logger.info("Step 2/4: Uploading audio to Gemini...")
-        uploaded_file = self.client.upload_audio(audio_path)
+        # Or reuse the transcription of a re-encoded copy of the same recording
+        fingerprint = []
+        if self.cache.match_similar:
+            fingerprint = audio_fingerprint(audio_path)
+            cached = self.cache.get_similar(fingerprint, "transcript", *cache_params)
+            if cached is not None:
+                self.cache.set(cache_key, cached)
+                return Transcription.model_validate_json(cached)
+
+        # Upload audio to Gemini (unless the caller shares its upload)
+        owns_upload = uploaded_file is None
+        if owns_upload:
+            logger.info("Step 2/4: Uploading audio to Gemini...")
+            uploaded_file = self.client.upload_audio(audio_path)
 
         try:
             # Generate transcription
@@ -148,18 +175,41 @@ class TranscriptionService:
 
             # Parse response
             logger.info("Step 4/4: Parsing transcription response...")
-            data = json.loads(response)
+            data = orjson.loads(response)
             transcription = self._parse_transcription(data)
             
             logger.info(f"✅ Transcription complete: {len(transcription.segments)} segments found")
             logger.info(f"   Duration: {transcription.total_duration}")
-            
+
+            self.cache.set(cache_key, transcription.model_dump_json())
+            self.cache.add_fingerprint(video_path, fingerprint)
             return transcription
 
         finally:
-            # Clean up uploaded file
-            logger.debug("Cleaning up uploaded file...")
-            self.client.delete_file(uploaded_file)
+            if owns_upload:
+                # Release uploaded file
+                logger.debug("Releasing uploaded file...")
+                self.client.release_file(uploaded_file)
+
+    def get_cached_transcription(self, video_path: Path) -> Transcription | None:
+        """
+        Look up a previous transcription of this exact video.
+
+        Nothing is extracted or uploaded.
+
+        Args:
+            video_path: Path to the video file
+
+        Returns:
+            The cached Transcription, or None on a miss
+        """
+        cache_key = self.cache.make_key(
+            video_path, "transcript", self.client.model, TRANSCRIPTION_PROMPT
+        )
+        cached = self.cache.get(cache_key)
+        if cached is None:
+            return None
+        return Transcription.model_validate_json(cached)
 
     def _parse_transcription(self, data: dict) -> Transcription:
         """Parse raw transcription data into Transcription model."""
@@ -185,11 +235,14 @@ class TranscriptionService:
 
 # Singleton instance
 _transcription_service: TranscriptionService | None = None
+_transcription_service_lock = threading.Lock()
 
 
 def get_transcription_service() -> TranscriptionService:
     """Get or create the transcription service instance."""
     global _transcription_service
     if _transcription_service is None:
-        _transcription_service = TranscriptionService()
+        with _transcription_service_lock:
+            if _transcription_service is None:
+                _transcription_service = TranscriptionService()
     return _transcription_service
@@ -0,0 +1,97 @@
+"""Combined transcription and shorts identification on one upload."""
+
+import asyncio
+import threading
+from pathlib import Path
+
+from app.schemas.shorts import ShortsAnalysis
+from app.schemas.transcription import Transcription
+from app.services.gemini_client import get_gemini_client
+from app.services.shorts_identifier import get_shorts_identifier_service
+from app.services.transcription import get_transcription_service
+from app.utils.audio import ensure_audio_exists_async
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class VideoAnalyzerService:
+    """Service running transcription and shorts identification together."""
+
+    def __init__(self):
+        """Initialize the video analyzer service."""
+        self.client = get_gemini_client()
+        self.transcriber = get_transcription_service()
+        self.identifier = get_shorts_identifier_service()
+        logger.info("VideoAnalyzerService initialized")
+
+    async def analyze_video(
+        self,
+        video_path: Path,
+        max_shorts: int | None = None,
+    ) -> tuple[Transcription, ShortsAnalysis]:
+        """
+        Transcribe a video and identify shorts from a single audio upload.
+
+        Both response caches are checked first. Only if at least one misses
+        is the audio extracted and uploaded, once, and the missing Gemini
+        requests run concurrently against the same uploaded file.
+
+        Args:
+            video_path: Path to the video file
+            max_shorts: Maximum number of shorts to identify
+
+        Returns:
+            Tuple of (transcription, shorts analysis)
+        """
+        logger.info(f"🧩 Starting combined analysis for: {video_path.name}")
+
+        transcription, analysis = await asyncio.gather(
+            asyncio.to_thread(self.transcriber.get_cached_transcription, video_path),
+            asyncio.to_thread(self.identifier.get_cached_analysis, video_path, max_shorts),
+        )
+        if transcription is not None and analysis is not None:
+            logger.info("✅ Combined analysis served from cache")
+            return transcription, analysis
+
+        audio_path = await ensure_audio_exists_async(video_path)
+        uploaded_file = await self.client.upload_file_async(audio_path)
+
+        try:
+            if transcription is None and analysis is None:
+                transcription, analysis = await asyncio.gather(
+                    asyncio.to_thread(
+                        self.transcriber.transcribe_video, video_path, uploaded_file
+                    ),
+                    self.identifier.identify_shorts_from_video(
+                        video_path, max_shorts, uploaded_file=uploaded_file
+                    ),
+                )
+            elif transcription is None:
+                transcription = await asyncio.to_thread(
+                    self.transcriber.transcribe_video, video_path, uploaded_file
+                )
+            else:
+                analysis = await self.identifier.identify_shorts_from_video(
+                    video_path, max_shorts, uploaded_file=uploaded_file
+                )
+        finally:
+            await asyncio.to_thread(self.client.release_file, uploaded_file)
+
+        logger.info("✅ Combined analysis complete")
+        return transcription, analysis
+
+
+# Singleton instance
+_video_analyzer: VideoAnalyzerService | None = None
+_video_analyzer_lock = threading.Lock()
+
+
+def get_video_analyzer_service() -> VideoAnalyzerService:
+    """Get or create the video analyzer service instance."""
+    global _video_analyzer
+    if _video_analyzer is None:
+        with _video_analyzer_lock:
+            if _video_analyzer is None:
+                _video_analyzer = VideoAnalyzerService()
+    return _video_analyzer
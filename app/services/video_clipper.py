@@ -1,9 +1,19 @@
 """Video clipping service using FFmpeg."""
 
+import asyncio
+import bisect
+import os
+import shutil
 import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
+from typing import NamedTuple
 
-import ffmpeg
+import orjson
+from cachetools import LRUCache
 
 from app.config import get_settings
 from app.schemas.shorts import PotentialShort, GeneratedShort
@@ -13,6 +23,134 @@ from app.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Seconds before the cut that re-encoding starts decoding from: the input
+# seek jumps to a keyframe near there, and the rest is trimmed after decode
+SEEK_PREROLL = 2
+
+# H.264 encoders for re-encoded clips, with quality flags roughly matching
+# libx264's "-preset fast -crf 23"
+SOFTWARE_ENCODER = "libx264"
+ENCODER_ARGS: dict[str, list[str]] = {
+    SOFTWARE_ENCODER: ["-preset", "fast", "-crf", "23"],
+    "h264_nvenc": ["-preset", "p4", "-cq", "23"],
+    "h264_videotoolbox": ["-q:v", "50"],
+    "h264_qsv": ["-preset", "fast", "-global_quality", "23"],
+}
+
+# Probed durations keyed by (path, size, mtime): a file's duration can't
+# change without one of those changing too. Probes run in worker threads,
+# so every access goes through the lock
+_durations: LRUCache[tuple[str, int, int], float] = LRUCache(maxsize=256)
+_durations_lock = threading.Lock()
+
+# Video codec, frame rate and keyframe times per file version, for smart cutting
+_keyframes: LRUCache[tuple[str, int, int], "KeyframeInfo"] = LRUCache(maxsize=32)
+_keyframes_lock = threading.Lock()
+
+
+def _ffprobe_duration_args(video_path: Path) -> list[str]:
+    """Build the ffprobe command printing a file's duration in seconds."""
+    return [
+        "ffprobe",
+        "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "csv=p=0",
+        str(video_path),
+    ]
+
+
+def _duration_key(video_path: Path) -> tuple[str, int, int]:
+    """Build the duration cache key for a file's current version."""
+    stat = video_path.stat()
+    return str(video_path), stat.st_size, stat.st_mtime_ns
+
+
+class KeyframeInfo(NamedTuple):
+    """A video stream's codec, frame rate and keyframe times."""
+
+    codec: str
+    frame_rate: float
+    # Seconds from the start of the file (container start offset removed),
+    # the same timeline FFmpeg's -ss seeks on
+    keyframes: list[float]
+
+
+class FFmpegCapabilities(NamedTuple):
+    """What the installed FFmpeg binary is and which encoders it has."""
+
+    path: str
+    version: str
+    encoders: frozenset[str]
+
+
+@lru_cache(maxsize=1)
+def get_ffmpeg_capabilities() -> FFmpegCapabilities:
+    """
+    Locate FFmpeg and list its encoders.
+
+    Probed once per process, and persisted next to the response cache keyed
+    by the binary's path and mtime, so restarts skip the FFmpeg spawn until
+    FFmpeg is upgraded.
+
+    Returns:
+        FFmpegCapabilities for the FFmpeg on PATH
+
+    Raises:
+        RuntimeError: If FFmpeg is not installed or doesn't run
+    """
+    ffmpeg_path = shutil.which("ffmpeg")
+    if ffmpeg_path is None:
+        logger.error("FFmpeg is not installed")
+        raise RuntimeError(
+            "FFmpeg is not installed. Please install FFmpeg to use video clipping."
+        )
+
+    mtime_ns = os.stat(ffmpeg_path).st_mtime_ns
+    cache_path = get_settings().response_cache_dir.expanduser() / "ffmpeg_caps.json"
+    try:
+        cached = orjson.loads(cache_path.read_bytes())
+        if cached["path"] == ffmpeg_path and cached["mtime_ns"] == mtime_ns:
+            return FFmpegCapabilities(
+                ffmpeg_path, cached["version"], frozenset(cached["encoders"])
+            )
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    # Without -hide_banner the version goes to stderr, the encoders to stdout
+    try:
+        result = subprocess.run(
+            [ffmpeg_path, "-encoders"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise RuntimeError(f"FFmpeg not available: {e}")
+    if result.returncode != 0:
+        raise RuntimeError("FFmpeg not available")
+
+    version = result.stderr.splitlines()[0] if result.stderr else ""
+    # Encoder lines look like " V....D libx264  libx264 H.264 ..."
+    encoders = frozenset(
+        fields[1]
+        for line in result.stdout.split("------", 1)[-1].splitlines()
+        if len(fields := line.split()) > 1
+    )
+    logger.debug("FFmpeg verified: %s", version)
+
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_bytes(orjson.dumps({
+            "path": ffmpeg_path,
+            "mtime_ns": mtime_ns,
+            "version": version,
+            "encoders": sorted(encoders),
+        }))
+    except OSError as e:
+        logger.debug("Could not persist FFmpeg capabilities: %s", e)
+
+    return FFmpegCapabilities(ffmpeg_path, version, encoders)
+
 
 class VideoClipperService:
     """Service for clipping video segments using FFmpeg."""
@@ -20,26 +158,39 @@ class VideoClipperService:
     def __init__(self):
         """Initialize the video clipper service."""
         self.settings = get_settings()
-        self._verify_ffmpeg()
+        self.cpu_count = os.cpu_count() or 1
+        self.ffmpeg = get_ffmpeg_capabilities()
+        self.encoder = self._select_encoder()
         logger.info("VideoClipperService initialized")
 
-    def _verify_ffmpeg(self) -> None:
-        """Verify FFmpeg is installed and accessible."""
-        try:
-            result = subprocess.run(
-                ["ffmpeg", "-version"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-            )
-            if result.returncode != 0:
-                raise RuntimeError("FFmpeg not available")
-            logger.debug("FFmpeg verified")
-        except FileNotFoundError:
-            logger.error("FFmpeg is not installed")
-            raise RuntimeError(
-                "FFmpeg is not installed. Please install FFmpeg to use video clipping."
-            )
+    def _select_encoder(self) -> str:
+        """
+        Pick the H.264 encoder for re-encoded clips.
+
+        Uses the configured hardware encoder (or the first one available for
+        "auto") if this FFmpeg build has it, otherwise libx264. A listed
+        encoder can still fail at runtime without the hardware; clip_video
+        falls back to libx264 then.
+        """
+        requested = self.settings.hw_encoder
+        if not requested:
+            return SOFTWARE_ENCODER
+
+        if requested == "auto":
+            candidates = [e for e in ENCODER_ARGS if e != SOFTWARE_ENCODER]
+        elif requested in ENCODER_ARGS:
+            candidates = [requested]
+        else:
+            logger.warning("Unsupported hardware encoder '%s', using %s", requested, SOFTWARE_ENCODER)
+            return SOFTWARE_ENCODER
+
+        for encoder in candidates:
+            if encoder in self.ffmpeg.encoders:
+                logger.info("🚀 Using hardware encoder: %s", encoder)
+                return encoder
+
+        logger.warning("Hardware encoder '%s' not available, using %s", requested, SOFTWARE_ENCODER)
+        return SOFTWARE_ENCODER
 
     def clip_video(
         self,
@@ -48,6 +199,8 @@ class VideoClipperService:
         end_time: str,
         output_path: Path,
         use_copy: bool = True,
+        threads: int = 0,
+        encoder: str | None = None,
     ) -> Path:
         """
         Clip a segment from a video.
@@ -58,66 +211,272 @@ class VideoClipperService:
             end_time: End timestamp (MM:SS or HH:MM:SS)
             output_path: Path for the output file
             use_copy: Use stream copy for faster processing (may be less accurate)
+            threads: FFmpeg encoder threads when re-encoding (0 = automatic)
+            encoder: H.264 encoder when re-encoding (None = service default)
 
         Returns:
             Path to the clipped video
         """
+        encoder = encoder or self.encoder
         start_seconds = parse_timestamp(start_time)
         end_seconds = parse_timestamp(end_time)
         duration = end_seconds - start_seconds
 
         start_ffmpeg = format_timestamp_ffmpeg(start_seconds)
         
-        logger.info(f"✂️ Clipping: {start_time} - {end_time} ({duration}s)")
-        logger.debug(f"   Output: {output_path.name}")
+        logger.info("✂️ Clipping: %s - %s (%ss)", start_time, end_time, duration)
+        logger.debug("   Output: %s", output_path.name)
+
+        if use_copy:
+            # Fast mode: use stream copy (no re-encoding)
+            logger.debug("Using stream copy mode (fast)")
+            args = [
+                "-ss", start_ffmpeg,
+                "-i", str(video_path),
+                "-t", str(duration),
+                "-c", "copy",
+                "-avoid_negative_ts", "make_zero",
+            ]
+        else:
+            # Accurate mode: re-encode for frame-accurate cutting. Seek
+            # the input to just before the cut so only the pre-roll is
+            # decoded, then trim the remainder exactly on the output
+            logger.debug("Using re-encode mode (accurate, %s)", encoder)
+            preroll = min(start_seconds, SEEK_PREROLL)
+            args = [
+                "-ss", format_timestamp_ffmpeg(start_seconds - preroll),
+                "-i", str(video_path),
+                "-ss", str(preroll),
+                "-t", str(duration),
+                "-c:v", encoder,
+                *ENCODER_ARGS[encoder],
+                "-c:a", "aac",
+                "-threads", str(threads),
+            ]
+
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", *args, str(output_path)],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode == 0:
+            logger.debug("✅ Clip created: %s", output_path.name)
+            return output_path
 
-        try:
-            if use_copy:
-                # Fast mode: use stream copy (no re-encoding)
-                logger.debug("Using stream copy mode (fast)")
-                (
-                    ffmpeg
-                    .input(str(video_path), ss=start_ffmpeg)
-                    .output(
-                        str(output_path),
-                        t=duration,
-                        c="copy",
-                        avoid_negative_ts="make_zero",
-                    )
-                    .overwrite_output()
-                    .run(capture_stdout=True, capture_stderr=True)
-                )
-            else:
-                # Accurate mode: re-encode for frame-accurate cutting
-                logger.debug("Using re-encode mode (accurate)")
-                (
-                    ffmpeg
-                    .input(str(video_path))
-                    .output(
-                        str(output_path),
-                        ss=start_ffmpeg,
-                        t=duration,
-                        vcodec="libx264",
-                        acodec="aac",
-                        preset="fast",
-                        crf=23,
+        # If copy mode fails, retry with re-encoding
+        if use_copy:
+            logger.warning("Stream copy failed, retrying with re-encoding...")
+            return self.clip_video(
+                video_path, start_time, end_time, output_path,
+                use_copy=False, threads=threads,
+            )
+        # If the hardware encoder fails, retry in software
+        if encoder != SOFTWARE_ENCODER:
+            logger.warning("%s failed, retrying with %s...", encoder, SOFTWARE_ENCODER)
+            return self.clip_video(
+                video_path, start_time, end_time, output_path,
+                use_copy=False, threads=threads, encoder=SOFTWARE_ENCODER,
+            )
+        logger.error("FFmpeg error: %s", result.stderr)
+        raise RuntimeError(f"FFmpeg error: {result.stderr}")
+
+    def clip_videos_copy(
+        self,
+        video_path: Path,
+        clips: list[tuple[str, str, Path]],
+    ) -> None:
+        """
+        Stream-copy several segments of a video in a single FFmpeg run.
+
+        Each segment is a separate seeking input of the same file mapped to
+        its own output, so FFmpeg starts once instead of once per clip.
+
+        Args:
+            video_path: Path to the source video
+            clips: (start_time, end_time, output_path) for each segment
+
+        Raises:
+            RuntimeError: If FFmpeg fails (no output is guaranteed then)
+        """
+        inputs: list[str] = []
+        outputs: list[str] = []
+        for n, (start_time, end_time, output_path) in enumerate(clips):
+            start_seconds = parse_timestamp(start_time)
+            duration = parse_timestamp(end_time) - start_seconds
+            inputs += [
+                "-ss", format_timestamp_ffmpeg(start_seconds),
+                "-t", str(duration),
+                "-i", str(video_path),
+            ]
+            outputs += [
+                "-map", str(n),
+                "-c", "copy",
+                "-avoid_negative_ts", "make_zero",
+                str(output_path),
+            ]
+
+        logger.info("✂️ Clipping %s segments in one pass (stream copy)", len(clips))
+        self._run_ffmpeg([*inputs, *outputs])
+
+    def clip_video_smart(
+        self,
+        video_path: Path,
+        start_time: str,
+        end_time: str,
+        output_path: Path,
+        threads: int = 0,
+    ) -> Path:
+        """
+        Clip a segment frame-accurately while re-encoding as little as possible.
+
+        Only the head of the clip, up to the first keyframe at or after the
+        start, is re-encoded; from that keyframe on the video is stream-copied,
+        and the parts are joined with the concat demuxer. Audio is re-encoded
+        for the whole clip (cheap, and avoids joining audio at a seam).
+
+        Falls back to a full re-encode for non-H.264 sources, clips without
+        a usable keyframe, or if any step (including the seam check) fails.
+
+        Args:
+            video_path: Path to the source video
+            start_time: Start timestamp (MM:SS or HH:MM:SS)
+            end_time: End timestamp (MM:SS or HH:MM:SS)
+            output_path: Path for the output file
+            threads: FFmpeg encoder threads for the re-encoded head
+
+        Returns:
+            Path to the clipped video
+        """
+        start_seconds = parse_timestamp(start_time)
+        end_seconds = parse_timestamp(end_time)
+
+        codec, frame_rate, keyframes = self.get_keyframes(video_path)
+        i = bisect.bisect_left(keyframes, start_seconds)
+        cut = keyframes[i] if i < len(keyframes) else None
+
+        if codec != "h264" or frame_rate <= 0 or cut is None or cut >= end_seconds:
+            logger.debug("Smart cut not possible, re-encoding the whole clip")
+            return self.clip_video(
+                video_path, start_time, end_time, output_path,
+                use_copy=False, threads=threads,
+            )
+
+        logger.info(
+            "✂️ Smart clipping: %s - %s (re-encoding %.2fs head)",
+            start_time, end_time, cut - start_seconds,
+        )
+
+        with tempfile.TemporaryDirectory(dir=output_path.parent) as tmp:
+            tmp_dir = Path(tmp)
+            parts: list[Path] = []
+
+            if cut > start_seconds:
+                # Head: decode from the keyframe before the start, encode
+                # [start, cut) with the same codec as the copied body
+                head = tmp_dir / "head.ts"
+                preroll = min(start_seconds, SEEK_PREROLL)
+                self._run_ffmpeg([
+                    "-ss", format_timestamp_ffmpeg(start_seconds - preroll),
+                    "-i", str(video_path),
+                    "-ss", str(preroll),
+                    "-t", f"{cut - start_seconds:.3f}",
+                    "-map", "0:v:0",
+                    "-c:v", SOFTWARE_ENCODER,
+                    *ENCODER_ARGS[SOFTWARE_ENCODER],
+                    "-pix_fmt", "yuv420p",
+                    "-threads", str(threads),
+                    str(head),
+                ])
+                parts.append(head)
+
+            # Body: starts on a keyframe, so stream copy is exact. Seek half
+            # a frame past it: the demuxer lands on the last keyframe at or
+            # before the seek point, and a millisecond-rounded cut can fall
+            # just short of the keyframe and pull in the whole previous GOP
+            body = tmp_dir / "body.ts"
+            self._run_ffmpeg([
+                "-ss", f"{cut + 0.5 / frame_rate:.6f}",
+                "-i", str(video_path),
+                "-t", f"{end_seconds - cut:.3f}",
+                "-map", "0:v:0",
+                "-c", "copy",
+                str(body),
+            ])
+            parts.append(body)
+
+            # A body that opens on the wrong keyframe repeats frames the head
+            # already covers; check the seam before joining
+            spans = [cut - start_seconds] * (len(parts) - 1) + [end_seconds - cut]
+            for part, seconds in zip(parts, spans):
+                expected = round(seconds * frame_rate)
+                frames = self._count_video_frames(part)
+                if abs(frames - expected) > max(2, expected // 50):
+                    raise RuntimeError(
+                        f"Smart cut seam check failed: {part.stem} has {frames} "
+                        f"frames, expected about {expected}"
                     )
-                    .overwrite_output()
-                    .run(capture_stdout=True, capture_stderr=True)
-                )
 
-            logger.debug(f"✅ Clip created: {output_path.name}")
-            return output_path
+            concat_list = tmp_dir / "parts.txt"
+            concat_list.write_text("".join(f"file '{part}'\n" for part in parts))
+
+            self._run_ffmpeg([
+                "-f", "concat", "-safe", "0", "-i", str(concat_list),
+                "-ss", format_timestamp_ffmpeg(start_seconds),
+                "-t", str(end_seconds - start_seconds),
+                "-i", str(video_path),
+                "-map", "0:v:0",
+                "-map", "1:a:0?",
+                "-c:v", "copy",
+                "-c:a", "aac",
+                "-movflags", "+faststart",
+                str(output_path),
+            ])
+
+        logger.debug("✅ Clip created: %s", output_path.name)
+        return output_path
+
+    def _count_video_frames(self, video_path: Path) -> int:
+        """
+        Count a file's video packets (one per frame; nothing is decoded).
 
-        except ffmpeg.Error as e:
-            # If copy mode fails, retry with re-encoding
-            if use_copy:
-                logger.warning("Stream copy failed, retrying with re-encoding...")
-                return self.clip_video(
-                    video_path, start_time, end_time, output_path, use_copy=False
-                )
-            logger.error(f"FFmpeg error: {e.stderr.decode()}")
-            raise RuntimeError(f"FFmpeg error: {e.stderr.decode()}")
+        Raises:
+            RuntimeError: If ffprobe fails
+        """
+        result = subprocess.run(
+            [
+                "ffprobe",
+                "-v", "error",
+                "-select_streams", "v:0",
+                "-count_packets",
+                "-show_entries", "stream=nb_read_packets",
+                "-of", "csv=p=0",
+                str(video_path),
+            ],
+            capture_output=True,
+            text=True,
+        )
+        try:
+            return int(result.stdout.strip())
+        except ValueError:
+            raise RuntimeError(f"ffprobe error: {result.stderr}") from None
+
+    def _run_ffmpeg(self, args: list[str]) -> None:
+        """
+        Run FFmpeg quietly with the given inputs and outputs.
+
+        Only errors are logged to stderr, so a failure's message is the
+        actual FFmpeg error rather than the banner and progress output.
+
+        Raises:
+            RuntimeError: If FFmpeg exits with an error
+        """
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", *args],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"FFmpeg error: {result.stderr}")
 
     def clip_short(
         self,
@@ -125,6 +484,7 @@ class VideoClipperService:
         short: PotentialShort,
         video_id: str,
         short_index: int,
+        threads: int = 0,
     ) -> GeneratedShort:
         """
         Generate a short clip from a video.
@@ -134,28 +494,63 @@ class VideoClipperService:
             short: PotentialShort with timing information
             video_id: ID of the source video
             short_index: Index of this short
+            threads: FFmpeg encoder threads when re-encoding (0 = automatic)
 
         Returns:
             GeneratedShort with file information
         """
+        short_id, output_path = self._new_output(video_id, short_index)
+
+        logger.info("📹 Generating short %s: %s...", short_index + 1, short.title[:40])
+
+        # Clip the video
+        if self.settings.smart_cut:
+            try:
+                self.clip_video_smart(
+                    video_path=video_path,
+                    start_time=short.start_time,
+                    end_time=short.end_time,
+                    output_path=output_path,
+                    threads=threads,
+                )
+            except RuntimeError as e:
+                logger.warning("Smart cut failed, re-encoding the whole clip: %s", e)
+                self.clip_video(
+                    video_path=video_path,
+                    start_time=short.start_time,
+                    end_time=short.end_time,
+                    output_path=output_path,
+                    use_copy=False,
+                    threads=threads,
+                )
+        else:
+            self.clip_video(
+                video_path=video_path,
+                start_time=short.start_time,
+                end_time=short.end_time,
+                output_path=output_path,
+                threads=threads,
+            )
+
+        return self._generated_short(short, short_id, output_path)
+
+    def _new_output(self, video_id: str, short_index: int) -> tuple[str, Path]:
+        """Allocate a unique short ID and its output path."""
         self.settings.ensure_directories()
 
         # Generate unique short ID
         short_id = generate_short_id(video_id, short_index)
 
         # Determine output format
-        output_path = self.settings.output_dir / f"{short_id}.mp4"
-
-        logger.info(f"📹 Generating short {short_index + 1}: {short.title[:40]}...")
-
-        # Clip the video
-        self.clip_video(
-            video_path=video_path,
-            start_time=short.start_time,
-            end_time=short.end_time,
-            output_path=output_path,
-        )
+        return short_id, self.settings.output_dir / f"{short_id}.mp4"
 
+    def _generated_short(
+        self,
+        short: PotentialShort,
+        short_id: str,
+        output_path: Path,
+    ) -> GeneratedShort:
+        """Describe a clipped short for the API response."""
         return GeneratedShort(
             short_id=short_id,
             title=short.title,
@@ -183,39 +578,187 @@ class VideoClipperService:
         Returns:
             List of generated shorts
         """
-        logger.info(f"🎬 Starting shorts generation for video: {video_id}")
-        generated = []
+        logger.info("🎬 Starting shorts generation for video: %s", video_id)
 
         if indices is None:
             indices = list(range(len(shorts)))
+        selected = sorted(set(indices) & set(range(len(shorts))))
 
-        total = len(indices)
-        logger.info(f"   Generating {total} shorts...")
-
-        for i, short in enumerate(shorts):
-            if i not in indices:
-                continue
+        total = len(selected)
+        if total == 0:
+            logger.info("✅ Shorts generation complete: nothing to generate")
+            return []
 
+        # Fast path: stream-copy every clip in a single FFmpeg run (starts
+        # snap to keyframes, so smart cutting skips it for exact cuts)
+        if not self.settings.smart_cut:
+            outputs = {i: self._new_output(video_id, i) for i in selected}
             try:
-                logger.info(f"   [{i+1}/{total}] Processing...")
-                generated_short = self.clip_short(
+                self.clip_videos_copy(
+                    video_path,
+                    [
+                        (shorts[i].start_time, shorts[i].end_time, outputs[i][1])
+                        for i in selected
+                    ],
+                )
+            except RuntimeError as e:
+                logger.warning("Single-pass stream copy failed, clipping individually: %s", e)
+                for _, output_path in outputs.values():
+                    output_path.unlink(missing_ok=True)
+            else:
+                generated = [
+                    self._generated_short(shorts[i], *outputs[i]) for i in selected
+                ]
+                logger.info("✅ Shorts generation complete: %s/%s successful", len(generated), total)
+                return generated
+
+        # Each clip is an independent FFmpeg process, so run several at once
+        # and split the cores between them to avoid oversubscription
+        workers = min(self.settings.clip_workers or self.cpu_count, total)
+        threads = max(self.cpu_count // workers, 1)
+        logger.info("   Generating %s shorts (%s parallel, %s threads each)...", total, workers, threads)
+
+        results: dict[int, GeneratedShort] = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    self.clip_short,
                     video_path=video_path,
-                    short=short,
+                    short=shorts[i],
                     video_id=video_id,
                     short_index=i,
-                )
-                generated.append(generated_short)
-                logger.info(f"   ✅ Short {i+1} complete")
-            except Exception as e:
-                logger.error(f"   ❌ Failed to generate short {i+1}: {e}")
+                    threads=threads,
+                ): i
+                for i in selected
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                    logger.info("   ✅ Short %s complete", i+1)
+                except Exception as e:
+                    logger.error("   ❌ Failed to generate short %s: %s", i+1, e)
+
+        # Keep the original short order
+        generated = [results[i] for i in selected if i in results]
+
+        logger.info("✅ Shorts generation complete: %s/%s successful", len(generated), total)
+        return generated
+
+    def get_keyframes(self, video_path: Path) -> KeyframeInfo:
+        """
+        Get a video's codec, frame rate and keyframe times (probed once per
+        file version).
+
+        Reads packet flags only, so nothing is decoded.
+
+        Args:
+            video_path: Path to the video file
+
+        Returns:
+            KeyframeInfo with keyframe times sorted and measured from the
+            start of the file; empty if the file can't be probed
+        """
+        empty = KeyframeInfo("", 0.0, [])
+        try:
+            key = _duration_key(video_path)
+        except OSError:
+            return empty
+        with _keyframes_lock:
+            cached = _keyframes.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            result = subprocess.run(
+                [
+                    "ffprobe",
+                    "-v", "error",
+                    "-select_streams", "v:0",
+                    "-show_entries",
+                    "stream=codec_name,avg_frame_rate:packet=pts_time,flags:format=start_time",
+                    "-of", "json",
+                    str(video_path),
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            probe = orjson.loads(result.stdout)
+        except (FileNotFoundError, subprocess.CalledProcessError, orjson.JSONDecodeError):
+            logger.warning("Could not read keyframes")
+            return empty
+
+        stream = (probe.get("streams") or [{}])[0]
+        codec = stream.get("codec_name", "")
+        num, _, den = stream.get("avg_frame_rate", "0/0").partition("/")
+        try:
+            frame_rate = float(num) / float(den or 1)
+        except (ValueError, ZeroDivisionError):
+            frame_rate = 0.0
+
+        # Packet times are absolute; -ss seeks relative to the container's
+        # start time, so shift keyframes onto that timeline
+        try:
+            offset = float(probe.get("format", {}).get("start_time", 0))
+        except ValueError:
+            offset = 0.0
+
+        keyframes = []
+        for packet in probe.get("packets", []):
+            if "K" not in packet.get("flags", ""):
+                continue
+            try:
+                keyframes.append(float(packet["pts_time"]) - offset)
+            except (KeyError, ValueError):
                 continue
+        keyframes.sort()
 
-        logger.info(f"✅ Shorts generation complete: {len(generated)}/{total} successful")
-        return generated
+        info = KeyframeInfo(codec, frame_rate, keyframes)
+        logger.debug("Found %s keyframes (%s, %.3f fps)", len(keyframes), codec, frame_rate)
+        with _keyframes_lock:
+            _keyframes[key] = info
+        return info
 
     def get_video_duration(self, video_path: Path) -> float:
         """
-        Get the duration of a video file.
+        Get the duration of a video file (probed once per file version).
+
+        Args:
+            video_path: Path to the video file
+
+        Returns:
+            Duration in seconds
+        """
+        try:
+            key = _duration_key(video_path)
+        except OSError:
+            logger.warning("Could not determine video duration")
+            return 0.0
+        with _durations_lock:
+            cached = _durations.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            result = subprocess.run(
+                _ffprobe_duration_args(video_path),
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            duration = float(result.stdout.strip())
+            logger.debug("Video duration: %.1fs", duration)
+            with _durations_lock:
+                _durations[key] = duration
+            return duration
+        except (FileNotFoundError, subprocess.CalledProcessError, ValueError):
+            logger.warning("Could not determine video duration")
+            return 0.0
+
+    async def get_video_duration_async(self, video_path: Path) -> float:
+        """
+        Get the duration of a video file without blocking the event loop.
 
         Args:
             video_path: Path to the video file
@@ -224,22 +767,45 @@ class VideoClipperService:
             Duration in seconds
         """
         try:
-            probe = ffmpeg.probe(str(video_path))
-            duration = float(probe["format"]["duration"])
-            logger.debug(f"Video duration: {duration:.1f}s")
+            key = _duration_key(video_path)
+        except OSError:
+            logger.warning("Could not determine video duration")
+            return 0.0
+        with _durations_lock:
+            cached = _durations.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *_ffprobe_duration_args(video_path),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            stdout, _ = await process.communicate()
+            if process.returncode != 0:
+                raise ValueError(f"ffprobe exited with code {process.returncode}")
+
+            duration = float(stdout.decode().strip())
+            logger.debug("Video duration: %.1fs", duration)
+            with _durations_lock:
+                _durations[key] = duration
             return duration
-        except (ffmpeg.Error, KeyError):
+        except (FileNotFoundError, ValueError):
             logger.warning("Could not determine video duration")
             return 0.0
 
 
 # Singleton instance
 _video_clipper: VideoClipperService | None = None
+_video_clipper_lock = threading.Lock()
 
 
 def get_video_clipper_service() -> VideoClipperService:
     """Get or create the video clipper service instance."""
     global _video_clipper
     if _video_clipper is None:
-        _video_clipper = VideoClipperService()
+        with _video_clipper_lock:
+            if _video_clipper is None:
+                _video_clipper = VideoClipperService()
     return _video_clipper
@@ -1,22 +1,209 @@
 """Audio extraction utilities using FFmpeg."""
 
+import asyncio
+import os
+import re
 import subprocess
+import threading
+import uuid
+import weakref
 from pathlib import Path
 import tempfile
 
+from app.services.video_clipper import get_video_clipper_service
 from app.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Cap FFmpeg's input analysis (default: up to 5 s / 5 MB) before it starts
+# working. Only used for audio extraction: a short probe can miss a
+# late-starting stream, and there "-map 0:a:0" turns that into a failure
+# that is retried with full analysis (a stream copy would silently drop it)
+FAST_PROBE_ARGS = ["-analyzeduration", "100000", "-probesize", "1000000"]
 
-def extract_audio(video_path: Path, output_path: Path | None = None) -> Path:
+# Videos longer than this (seconds) have their audio encoded in parallel
+# time shards, up to AUDIO_MAX_SHARDS at once
+AUDIO_SHARD_MIN_DURATION = 600
+AUDIO_MAX_SHARDS = 8
+
+# Per-audio-path locks so concurrent callers don't extract twice
+# (weakly held, so a path's lock goes away once nobody is using it)
+_extraction_locks: weakref.WeakValueDictionary[str, threading.Lock] = (
+    weakref.WeakValueDictionary()
+)
+_extraction_locks_guard = threading.Lock()
+_async_extraction_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = (
+    weakref.WeakValueDictionary()
+)
+
+_RMS_PATTERN = re.compile(r"RMS_level=(\S+)")
+
+# Floor for silent (-inf dB) windows in audio fingerprints
+_FINGERPRINT_FLOOR_DB = -100.0
+
+_SILENCE_PATTERN = re.compile(
+    r"silence_end: (?P<end>[\d.]+) \| silence_duration: (?P<duration>[\d.]+)"
+)
+
+
+# Gemini downsamples audio to 16 kHz mono on its side, so encoding
+# more than that only costs encoder time and upload bandwidth
+# -acodec libmp3lame: use MP3 codec
+# -ac 1: mono
+# -ar 16000: sample rate 16kHz
+# -ab 48k: bitrate 48kbps (transparent for speech at 16kHz mono)
+_MP3_ARGS = ["-acodec", "libmp3lame", "-ac", "1", "-ar", "16000", "-ab", "48k"]
+
+# Same sample format, uncompressed: shards are joined before the one MP3 encode
+_PCM_ARGS = ["-acodec", "pcm_s16le", "-ac", "1", "-ar", "16000"]
+
+
+def _extract_audio_args(
+    video_path: Path,
+    output_path: Path,
+    fast_probe: bool,
+    start: float = 0.0,
+    duration: float | None = None,
+    codec_args: list[str] = _MP3_ARGS,
+) -> list[str]:
+    """Build the FFmpeg command extracting (part of) a video's audio track."""
+    return [
+        "ffmpeg",
+        *(FAST_PROBE_ARGS if fast_probe else []),
+        *(["-ss", f"{start:.3f}"] if start else []),
+        "-i", str(video_path),
+        *(["-t", f"{duration:.3f}"] if duration is not None else []),
+        "-vn",  # No video
+        "-map", "0:a:0",  # First audio stream only
+        *codec_args,
+        "-y",  # Overwrite output
+        str(output_path),
+    ]
+
+
+async def _run_ffmpeg_async(args: list[str]) -> tuple[int, str]:
+    """
+    Run an FFmpeg command with the extraction timeout.
+
+    Returns:
+        Tuple of (exit code, stderr)
+
+    Raises:
+        RuntimeError: If FFmpeg is missing or times out
+    """
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except FileNotFoundError:
+        logger.error("FFmpeg not found")
+        raise RuntimeError("FFmpeg is not installed")
+
+    try:
+        _, stderr = await asyncio.wait_for(
+            process.communicate(),
+            timeout=300,  # 5 minute timeout
+        )
+    except asyncio.TimeoutError:
+        await _kill(process)
+        logger.error("Audio extraction timed out")
+        raise RuntimeError("Audio extraction timed out")
+    except asyncio.CancelledError:
+        # Don't leave FFmpeg writing into files the caller is cleaning up
+        await _kill(process)
+        raise
+
+    return process.returncode, stderr.decode(errors="replace")
+
+
+async def _kill(process: asyncio.subprocess.Process) -> None:
+    """Kill a subprocess (if it's still running) and reap it."""
+    try:
+        process.kill()
+    except ProcessLookupError:
+        pass
+    await process.wait()
+
+
+async def _extract_audio_sharded(
+    video_path: Path,
+    output_path: Path,
+    fast_probe: bool,
+    duration: float,
+    shards: int,
+) -> tuple[int, str]:
     """
-    Extract audio from a video file.
+    Decode audio as equal time shards in parallel, then encode it once.
+
+    Shards are written as PCM, which joins sample-exactly; encoding each
+    shard to MP3 would leave encoder delay and padding at every seam and
+    shift later timestamps against the video.
+
+    Returns:
+        Tuple of (exit code, stderr) of the first failing step, or of the join
+    """
+    # Shared, rounded boundaries so consecutive shards neither gap nor overlap
+    bounds = [round(duration * i / shards, 3) for i in range(shards)]
+
+    with tempfile.TemporaryDirectory(dir=output_path.parent) as tmp:
+        tmp_dir = Path(tmp)
+        parts = [tmp_dir / f"part{i}.wav" for i in range(shards)]
+
+        tasks = [
+            asyncio.create_task(_run_ffmpeg_async(_extract_audio_args(
+                video_path,
+                part,
+                fast_probe,
+                start=bounds[i],
+                # The last shard runs to the end so nothing is cut off
+                duration=bounds[i + 1] - bounds[i] if i < shards - 1 else None,
+                codec_args=_PCM_ARGS,
+            )))
+            for i, part in enumerate(parts)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                returncode, stderr = await next_done
+                if returncode != 0:
+                    return returncode, stderr
+        finally:
+            # On the first failure, stop the other shards' FFmpeg processes
+            # before the temporary directory is removed under them
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        concat_list = tmp_dir / "parts.txt"
+        concat_list.write_text("".join(f"file '{part}'\n" for part in parts))
+
+        return await _run_ffmpeg_async([
+            "ffmpeg",
+            "-f", "concat", "-safe", "0",
+            "-i", str(concat_list),
+            *_MP3_ARGS,
+            "-y",
+            str(output_path),
+        ])
+
+
+async def extract_audio_async(
+    video_path: Path,
+    output_path: Path | None = None,
+    fast_probe: bool = True,
+) -> Path:
+    """
+    Extract audio from a video file without blocking the event loop.
+
+    Audio of long videos is encoded in parallel time shards.
 
     Args:
         video_path: Path to the video file
         output_path: Optional path for the output audio file.
                      If not provided, creates a temp file.
+        fast_probe: Limit input analysis for a faster start (retried with
+                    full analysis if extraction fails)
 
     Returns:
         Path to the extracted audio file
@@ -25,49 +212,73 @@ def extract_audio(video_path: Path, output_path: Path | None = None) -> Path:
     if output_path is None:
         output_path = video_path.with_suffix(".mp3")
 
-    logger.info(f"🎵 Extracting audio from: {video_path.name}")
+    logger.info("🎵 Extracting audio from: %s", video_path.name)
 
-    try:
-        # Extract audio using FFmpeg
-        # -vn: no video
-        # -acodec mp3: use MP3 codec
-        # -ab 128k: bitrate 128kbps (good quality, small size)
-        # -ar 44100: sample rate 44.1kHz
-        result = subprocess.run(
-            [
-                "ffmpeg",
-                "-i", str(video_path),
-                "-vn",  # No video
-                "-acodec", "libmp3lame",
-                "-ab", "128k",
-                "-ar", "44100",
-                "-y",  # Overwrite output
-                str(output_path),
-            ],
-            capture_output=True,
-            text=True,
-            timeout=300,  # 5 minute timeout
+    shards = min(os.cpu_count() or 1, AUDIO_MAX_SHARDS)
+    duration = (
+        await get_video_clipper_service().get_video_duration_async(video_path)
+        if shards > 1 else 0.0
+    )
+
+    if duration > AUDIO_SHARD_MIN_DURATION:
+        logger.info("   Encoding %.0fs of audio in %s parallel shards", duration, shards)
+        returncode, stderr = await _extract_audio_sharded(
+            video_path, output_path, fast_probe, duration, shards
+        )
+    else:
+        returncode, stderr = await _run_ffmpeg_async(
+            _extract_audio_args(video_path, output_path, fast_probe)
         )
 
-        if result.returncode != 0:
-            logger.error(f"FFmpeg error: {result.stderr}")
-            raise RuntimeError(f"Audio extraction failed: {result.stderr}")
+    if returncode != 0:
+        if fast_probe:
+            logger.warning("Audio extraction failed, retrying with full input analysis...")
+            return await extract_audio_async(video_path, output_path, fast_probe=False)
+        logger.error("FFmpeg error: %s", stderr)
+        raise RuntimeError(f"Audio extraction failed: {stderr}")
 
-        # Get file sizes for comparison
-        video_size = video_path.stat().st_size / (1024 * 1024)  # MB
-        audio_size = output_path.stat().st_size / (1024 * 1024)  # MB
-        reduction = (1 - audio_size / video_size) * 100
+    # Get file sizes for comparison
+    video_size = video_path.stat().st_size / (1024 * 1024)  # MB
+    audio_size = output_path.stat().st_size / (1024 * 1024)  # MB
+    reduction = (1 - audio_size / video_size) * 100
 
-        logger.info(f"✅ Audio extracted: {audio_size:.1f}MB (reduced by {reduction:.0f}% from {video_size:.1f}MB)")
+    logger.info("✅ Audio extracted: %.1fMB (reduced by %.0f%% from %.1fMB)", audio_size, reduction, video_size)
 
-        return output_path
+    return output_path
 
-    except subprocess.TimeoutExpired:
-        logger.error("Audio extraction timed out")
-        raise RuntimeError("Audio extraction timed out")
-    except FileNotFoundError:
-        logger.error("FFmpeg not found")
-        raise RuntimeError("FFmpeg is not installed")
+
+def extract_audio(
+    video_path: Path,
+    output_path: Path | None = None,
+    fast_probe: bool = True,
+) -> Path:
+    """
+    Extract audio from a video file, blocking until it is done.
+
+    Runs extract_audio_async on a private event loop, so it may only be
+    called from threads without a running loop (e.g. worker threads);
+    coroutines must await extract_audio_async instead.
+
+    Args:
+        video_path: Path to the video file
+        output_path: Optional path for the output audio file.
+                     If not provided, creates a temp file.
+        fast_probe: Limit input analysis for a faster start
+
+    Returns:
+        Path to the extracted audio file
+
+    Raises:
+        RuntimeError: If called from a thread running an event loop
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(extract_audio_async(video_path, output_path, fast_probe))
+    raise RuntimeError(
+        "extract_audio() would block the running event loop; "
+        "await extract_audio_async() instead"
+    )
 
 
 def get_audio_path(video_path: Path) -> Path:
@@ -83,10 +294,33 @@ def get_audio_path(video_path: Path) -> Path:
     return video_path.with_suffix(".mp3")
 
 
+def _extraction_lock(audio_path: Path) -> threading.Lock:
+    """Get the lock guarding extraction to an audio path."""
+    with _extraction_locks_guard:
+        return _extraction_locks.setdefault(str(audio_path), threading.Lock())
+
+
+def _audio_is_current(audio_path: Path, video_path: Path) -> bool:
+    """Check that extracted audio exists and isn't older than its video."""
+    return (
+        audio_path.exists()
+        and audio_path.stat().st_mtime_ns >= video_path.stat().st_mtime_ns
+    )
+
+
+def _partial_path(audio_path: Path) -> Path:
+    """Get a unique temporary name to extract to before renaming into place."""
+    return audio_path.with_name(
+        f"{audio_path.stem}.{uuid.uuid4().hex[:8]}.partial{audio_path.suffix}"
+    )
+
+
 def ensure_audio_exists(video_path: Path) -> Path:
     """
     Ensure audio file exists for a video, extracting if necessary.
 
+    Audio older than the video is treated as stale and re-extracted.
+
     Args:
         video_path: Path to the video file
 
@@ -95,8 +329,145 @@ def ensure_audio_exists(video_path: Path) -> Path:
     """
     audio_path = get_audio_path(video_path)
 
-    if audio_path.exists():
-        logger.debug(f"Audio already exists: {audio_path.name}")
+    # One extraction per video even when several stages ask at once
+    with _extraction_lock(audio_path):
+        if _audio_is_current(audio_path, video_path):
+            logger.debug("Audio already exists: %s", audio_path.name)
+            return audio_path
+
+        # Extract to a temporary name so a half-written file is never reused
+        partial_path = _partial_path(audio_path)
+        try:
+            extract_audio(video_path, partial_path)
+        except BaseException:
+            # Failed or cancelled: nothing else would remove the partial file
+            partial_path.unlink(missing_ok=True)
+            raise
+        os.replace(partial_path, audio_path)
         return audio_path
 
-    return extract_audio(video_path, audio_path)
+
+async def ensure_audio_exists_async(video_path: Path) -> Path:
+    """
+    Ensure audio file exists for a video without blocking the event loop.
+
+    Args:
+        video_path: Path to the video file
+
+    Returns:
+        Path to the audio file
+    """
+    audio_path = get_audio_path(video_path)
+
+    # One extraction per video among coroutines on this loop; threads use
+    # their own lock, and unique partial names keep the two from clashing
+    lock = _async_extraction_locks.setdefault(str(audio_path), asyncio.Lock())
+    async with lock:
+        if _audio_is_current(audio_path, video_path):
+            logger.debug("Audio already exists: %s", audio_path.name)
+            return audio_path
+
+        partial_path = _partial_path(audio_path)
+        try:
+            await extract_audio_async(video_path, partial_path)
+        except BaseException:
+            # Failed or cancelled: nothing else would remove the partial file
+            partial_path.unlink(missing_ok=True)
+            raise
+        os.replace(partial_path, audio_path)
+        return audio_path
+
+
+def find_silence_before(
+    audio_path: Path,
+    before_seconds: float,
+    lookback_seconds: float,
+    min_silence: float = 0.3,
+    noise_db: int = -30,
+) -> float | None:
+    """
+    Find where speech resumes after the longest pause shortly before a time.
+
+    Runs FFmpeg's silencedetect over the window
+    [before_seconds - lookback_seconds, before_seconds] only.
+
+    Args:
+        audio_path: Path to the audio file
+        before_seconds: End of the search window (seconds)
+        lookback_seconds: Length of the search window (seconds)
+        min_silence: Shortest pause counted as a break (seconds)
+        noise_db: Level below which audio counts as silence (dB)
+
+    Returns:
+        Absolute time (seconds) at which the longest pause ends, or None if
+        the window has no pause
+    """
+    window_start = max(before_seconds - lookback_seconds, 0)
+
+    try:
+        result = subprocess.run(
+            [
+                "ffmpeg",
+                "-ss", str(window_start),
+                "-t", str(before_seconds - window_start),
+                "-i", str(audio_path),
+                "-af", f"silencedetect=noise={noise_db}dB:d={min_silence}",
+                "-f", "null",
+                "-",
+            ],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+        logger.warning("Silence detection failed: %s", e)
+        return None
+
+    silences = [
+        (float(m["duration"]), float(m["end"]))
+        for m in _SILENCE_PATTERN.finditer(result.stderr)
+    ]
+    if not silences:
+        return None
+
+    _, silence_end = max(silences)
+    return window_start + silence_end
+
+
+def audio_fingerprint(audio_path: Path) -> list[float]:
+    """
+    Compute a loudness envelope of an audio file (RMS dB per second).
+
+    The envelope survives re-encoding at other bitrates or containers, so it
+    can match copies of the same recording whose bytes differ.
+
+    Args:
+        audio_path: Path to the audio file
+
+    Returns:
+        One RMS level (dB) per second of audio, or an empty list on failure
+    """
+    try:
+        result = subprocess.run(
+            [
+                "ffmpeg",
+                "-i", str(audio_path),
+                "-af",
+                "aresample=8000,asetnsamples=n=8000,"
+                "astats=metadata=1:reset=1,"
+                "ametadata=mode=print:key=lavfi.astats.Overall.RMS_level:file=-",
+                "-f", "null",
+                "-",
+            ],
+            capture_output=True,
+            text=True,
+            timeout=300,
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+        logger.warning("Audio fingerprinting failed: %s", e)
+        return []
+
+    return [
+        max(float(level), _FINGERPRINT_FLOOR_DB)
+        for level in _RMS_PATTERN.findall(result.stdout)
+    ]
@@ -1,12 +1,40 @@
 """File management utilities for video uploads and outputs."""
 
+import hashlib
+import os
+import threading
 import uuid
-import aiofiles
 from pathlib import Path
+from typing import BinaryIO
+
+from cachetools import LRUCache
 from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
 
 from app.config import get_settings
 
+# Bytes read per chunk when saving uploads (bounds memory per request)
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Read buffer when hashing files (bounds memory while hashing large videos)
+HASH_BUFFER_SIZE = 8 << 20  # 8 MiB
+
+# Upload extensions in lookup priority order (videos before extracted audio)
+_VIDEO_EXTENSION_RANK = {
+    ext: rank
+    for rank, ext in enumerate([".mp4", ".mov", ".avi", ".mkv", ".webm", ".mpeg"])
+}
+
+# SHA-256 digests keyed by (path, size, mtime_ns), so each file version is
+# hashed at most once
+_hashes: LRUCache[tuple[str, int, int], str] = LRUCache(maxsize=256)
+_hashes_lock = threading.Lock()
+
+
+def _hash_key(file_path: Path, stat: os.stat_result) -> tuple[str, int, int]:
+    """Build the hash cache key for a file's current version."""
+    return str(file_path), stat.st_size, stat.st_mtime_ns
+
 
 async def save_upload_file(upload_file: UploadFile) -> tuple[str, Path]:
     """
@@ -31,14 +59,47 @@ async def save_upload_file(upload_file: UploadFile) -> tuple[str, Path]:
     # Create file path
     file_path = settings.upload_dir / f"{video_id}{extension}"
 
-    # Save file
-    async with aiofiles.open(file_path, "wb") as f:
-        content = await upload_file.read()
-        await f.write(content)
+    # Copy the spooled upload in one worker thread rather than one
+    # thread hop per chunk
+    digest = await run_in_threadpool(
+        _copy_upload, upload_file.file, file_path, upload_file.size
+    )
+    key = _hash_key(file_path, file_path.stat())
+    with _hashes_lock:
+        _hashes[key] = digest
 
     return video_id, file_path
 
 
+def _copy_upload(source: BinaryIO, file_path: Path, size: int | None) -> str:
+    """
+    Write an upload to disk in fixed-size chunks and hash it on the way.
+
+    Chunking keeps large uploads out of memory, and hashing while copying
+    means the response cache never has to read the file back.
+
+    Args:
+        source: Spooled upload file object
+        file_path: Destination path
+        size: Upload size in bytes, if known (used to preallocate)
+
+    Returns:
+        Hex-encoded SHA-256 digest of the upload
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "wb") as f:
+        if size and hasattr(os, "posix_fallocate"):
+            # Reserve the space up front to avoid a fragmented file
+            try:
+                os.posix_fallocate(f.fileno(), 0, size)
+            except OSError:
+                pass
+        while chunk := source.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
+
+
 def get_upload_path(video_id: str) -> Path | None:
     """
     Get the file path for an uploaded video by its ID.
@@ -51,21 +112,25 @@ def get_upload_path(video_id: str) -> Path | None:
     """
     settings = get_settings()
 
-    # Video extensions to prioritize (in order)
-    video_extensions = [".mp4", ".mov", ".avi", ".mkv", ".webm", ".mpeg"]
-    
-    # First, search for video files (prioritize over audio)
-    for ext in video_extensions:
-        video_path = settings.upload_dir / f"{video_id}{ext}"
-        if video_path.is_file():
-            return video_path
-
-    # Fallback: search for any matching file
-    for file_path in settings.upload_dir.glob(f"{video_id}.*"):
-        if file_path.is_file():
-            return file_path
+    # One directory scan; video files are preferred over anything else
+    # (e.g. the extracted .mp3) stored under the same ID
+    best_path, best_rank = None, len(_VIDEO_EXTENSION_RANK)
+    try:
+        with os.scandir(settings.upload_dir) as entries:
+            for entry in entries:
+                stem, dot, ext = entry.name.rpartition(".")
+                if not dot or stem != video_id or not entry.is_file():
+                    continue
 
-    return None
+                rank = _VIDEO_EXTENSION_RANK.get(f".{ext}", len(_VIDEO_EXTENSION_RANK))
+                if best_path is None or rank < best_rank:
+                    best_path, best_rank = Path(entry.path), rank
+                    if rank == 0:
+                        break
+    except FileNotFoundError:
+        return None
+
+    return best_path
 
 
 def get_output_path(short_id: str) -> Path | None:
@@ -80,6 +145,11 @@ def get_output_path(short_id: str) -> Path | None:
     """
     settings = get_settings()
 
+    # Shorts are always written as .mp4, so try that name before scanning
+    file_path = settings.output_dir / f"{short_id}.mp4"
+    if file_path.is_file():
+        return file_path
+
     for file_path in settings.output_dir.glob(f"{short_id}.*"):
         if file_path.is_file():
             return file_path
@@ -107,6 +177,33 @@ def get_file_size(file_path: Path) -> int:
     return file_path.stat().st_size if file_path.exists() else 0
 
 
+def hash_file(file_path: Path) -> str:
+    """
+    Get the SHA-256 hex digest of a file's contents.
+
+    The file is read in chunks, so memory use is constant, and the digest
+    is reused until the file's size or modification time changes. Uploads
+    are hashed while being saved, so they are never read back for this.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Hex-encoded SHA-256 digest
+    """
+    key = _hash_key(file_path, file_path.stat())
+    with _hashes_lock:
+        digest = _hashes.get(key)
+    if digest is not None:
+        return digest
+
+    with open(file_path, "rb", buffering=HASH_BUFFER_SIZE) as f:
+        digest = hashlib.file_digest(f, "sha256").hexdigest()
+    with _hashes_lock:
+        _hashes[key] = digest
+    return digest
+
+
 def cleanup_video(video_id: str) -> bool:
     """
     Remove uploaded video and its generated shorts.
@@ -126,9 +223,19 @@ def cleanup_video(video_id: str) -> bool:
         upload_path.unlink()
         cleaned = True
 
-    # Remove generated shorts
-    for short_path in settings.output_dir.glob(f"{video_id[:8]}_short_*"):
-        short_path.unlink()
-        cleaned = True
+    # Remove generated shorts (one directory scan, plain prefix match)
+    prefix = f"{video_id[:8]}_short_"
+    try:
+        with os.scandir(settings.output_dir) as entries:
+            short_paths = [entry.path for entry in entries if entry.name.startswith(prefix)]
+    except FileNotFoundError:
+        short_paths = []
+
+    for short_path in short_paths:
+        try:
+            os.unlink(short_path)
+            cleaned = True
+        except FileNotFoundError:
+            continue
 
     return cleaned
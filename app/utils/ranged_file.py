@@ -0,0 +1,86 @@
+"""Chunked, HTTP Range-aware file streaming utilities."""
+
+import re
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import aiofiles
+
+# Read window per chunk (bounds memory per download)
+CHUNK_SIZE = 1 << 20  # 1 MiB
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range_header(range_header: str | None, file_size: int) -> tuple[int, int] | None:
+    """
+    Parse a single-range HTTP Range header.
+
+    Headers this doesn't handle (multiple ranges, other units, malformed or
+    inverted ranges) are ignored, as RFC 9110 recommends: the caller then
+    sends the full file with a 200.
+
+    Args:
+        range_header: Value of the Range header (e.g., "bytes=0-1023")
+        file_size: Size of the file in bytes
+
+    Returns:
+        Inclusive (start, end) byte offsets, or None to send the whole file
+
+    Raises:
+        ValueError: If the range is well-formed but starts past the end of
+            the file (not satisfiable)
+    """
+    if not range_header:
+        return None
+
+    match = _RANGE_PATTERN.match(range_header.strip())
+    if not match:
+        return None
+
+    start_str, end_str = match.groups()
+    if start_str:
+        start = int(start_str)
+        end = int(end_str) if end_str else file_size - 1
+        if end_str and end < start:
+            return None
+    elif end_str:
+        # Suffix range: the last N bytes
+        start = max(file_size - int(end_str), 0)
+        end = file_size - 1
+    else:
+        return None
+
+    if start >= file_size:
+        raise ValueError(f"Unsatisfiable range: {range_header}")
+
+    return start, min(end, file_size - 1)
+
+
+async def iter_file(
+    path: Path,
+    start: int,
+    end: int,
+    chunk_size: int = CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    Stream a byte range of a file in bounded chunks.
+
+    Args:
+        path: Path to the file
+        start: First byte offset (inclusive)
+        end: Last byte offset (inclusive)
+        chunk_size: Maximum bytes read per chunk
+
+    Yields:
+        Consecutive chunks of the requested range
+    """
+    async with aiofiles.open(path, "rb") as f:
+        await f.seek(start)
+        position = start
+        while position <= end:
+            chunk = await f.read(min(chunk_size, end - position + 1))
+            if not chunk:
+                break
+            position += len(chunk)
+            yield chunk
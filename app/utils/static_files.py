@@ -0,0 +1,31 @@
+"""Static file serving with browser caching headers."""
+
+from typing import Any
+
+from fastapi.staticfiles import StaticFiles
+from starlette.responses import Response
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles that lets browsers reuse unchanged assets.
+
+    Starlette already sends an ETag and answers If-None-Match with 304;
+    this adds a Cache-Control max-age so repeat page loads skip the request.
+    """
+
+    def __init__(self, *args: Any, max_age: int = 3600, **kwargs: Any):
+        """
+        Initialize the static files app.
+
+        Args:
+            max_age: Seconds browsers may reuse an asset without revalidating
+        """
+        super().__init__(*args, **kwargs)
+        self.cache_control = f"public, max-age={max_age}"
+
+    def file_response(self, *args: Any, **kwargs: Any) -> Response:
+        """Build the file (or 304) response with caching headers."""
+        response = super().file_response(*args, **kwargs)
+        response.headers.setdefault("Cache-Control", self.cache_control)
+        return response
@@ -1,12 +1,22 @@
 """Utility functions for timestamp handling."""
 
 import re
+from functools import lru_cache
 
+# [HH:]MM:SS, shared by parsing and validation so they always agree
+_TIMESTAMP_PATTERN = re.compile(
+    r"^\s*(?:(?P<hours>\d+):)?(?P<minutes>\d+):(?P<seconds>\d+)\s*$"
+)
 
+
+@lru_cache(maxsize=4096)
 def parse_timestamp(timestamp: str) -> int:
     """
     Parse a timestamp string (MM:SS or HH:MM:SS) to total seconds.
 
+    Results are memoized: the same start/end strings are parsed again by
+    duration validation, context alignment and overlap checks.
+
     Args:
         timestamp: Timestamp string in MM:SS or HH:MM:SS format
 
@@ -19,23 +29,23 @@ def parse_timestamp(timestamp: str) -> int:
         >>> parse_timestamp("01:15:30")
         4530
     """
-    parts = timestamp.strip().split(":")
-    if len(parts) == 2:
-        minutes, seconds = int(parts[0]), int(parts[1])
-        return minutes * 60 + seconds
-    elif len(parts) == 3:
-        hours, minutes, seconds = int(parts[0]), int(parts[1]), int(parts[2])
-        return hours * 3600 + minutes * 60 + seconds
-    else:
+    match = _TIMESTAMP_PATTERN.match(timestamp)
+    if not match:
         raise ValueError(f"Invalid timestamp format: {timestamp}")
 
+    return (
+        int(match["hours"] or 0) * 3600
+        + int(match["minutes"]) * 60
+        + int(match["seconds"])
+    )
 
-def format_timestamp(total_seconds: int) -> str:
+
+def format_timestamp(total_seconds: float) -> str:
     """
     Format total seconds to MM:SS timestamp string.
 
     Args:
-        total_seconds: Total seconds as integer
+        total_seconds: Total seconds (fractions are truncated)
 
     Returns:
         Timestamp string in MM:SS format
@@ -46,11 +56,31 @@ def format_timestamp(total_seconds: int) -> str:
         >>> format_timestamp(3661)
         '61:01'
     """
-    minutes = total_seconds // 60
-    seconds = total_seconds % 60
+    minutes, seconds = divmod(int(total_seconds), 60)
     return f"{minutes:02d}:{seconds:02d}"
 
 
+def format_timestamp_hms(total_seconds: float) -> str:
+    """
+    Format total seconds to HH:MM:SS timestamp string.
+
+    Args:
+        total_seconds: Total seconds (fractions are truncated)
+
+    Returns:
+        Timestamp string in HH:MM:SS format
+
+    Examples:
+        >>> format_timestamp_hms(90.5)
+        '00:01:30'
+        >>> format_timestamp_hms(3661)
+        '01:01:01'
+    """
+    minutes, seconds = divmod(int(total_seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
 def format_timestamp_ffmpeg(total_seconds: float) -> str:
     """
     Format total seconds to HH:MM:SS.mmm timestamp for FFmpeg.
@@ -81,10 +111,9 @@ def validate_timestamp(timestamp: str) -> bool:
         timestamp: String to validate
 
     Returns:
-        True if valid timestamp format
+        True if parse_timestamp accepts the string
     """
-    pattern = r"^\d{1,2}:\d{2}(:\d{2})?$"
-    return bool(re.match(pattern, timestamp.strip()))
+    return _TIMESTAMP_PATTERN.match(timestamp) is not None
 
 
 def calculate_duration(start_time: str, end_time: str) -> int: